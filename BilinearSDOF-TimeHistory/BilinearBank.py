@@ -0,0 +1,172 @@
+import numpy as np
+
+# Order of the channels along the first axis of the stacked output
+CHANNELS = ("time", "rel_disp", "rel_vel", "rel_accel", "force")
+
+
+def BankResponse(mass, k_init, f_y, motion, dt, xi=0.05, r_post=0.0,
+                 analysis_dt=None, tol=1.0e-10, iterations=10, validate=0,
+                 validate_tol=1.0e-3):
+    """
+    Run seismic analysis of a bank of nonlinear SDOFs at once
+
+    Every oscillator is the Steel01-equivalent bilinear SDOF of
+    InelasticResponse (kinematic hardening, stiffness-proportional Rayleigh
+    damping on the current tangent, Newmark average acceleration), but the
+    whole bank is integrated together with one NumPy array per state
+    variable instead of one OpenSees model per oscillator.
+
+    :param mass: float or array, SDOF masses
+    :param k_init: float or array, spring stiffnesses
+    :param f_y: float or array, yield strengths
+    :param motion: list, acceleration values
+    :param dt: float, time step of acceleration values
+    :param xi: float or array, damping ratios
+    :param r_post: float or array, post-yield stiffness ratios
+    :param analysis_dt: float, time step of the analysis; by default the
+        automatic step of InelasticResponse for the shortest period of the
+        bank, see BilinearSDOF.AnalysisDt
+    :param tol: float, energy increment tolerance of the Newton iterations
+    :param iterations: int, maximum number of Newton iterations per step
+    :param validate: int, number of oscillators re-run through
+        InelasticResponse to check the bank against the OpenSees path
+    :param validate_tol: float, allowed error of the validation, relative to
+        the peak of each compared channel
+    :return: array of shape (len(CHANNELS), n_oscillators, n_steps); the
+        time channel is the end of every analysis step, like InelasticResponse
+    """
+    mass, k_init, f_y, xi, r_post = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(x, dtype=float))
+          for x in (mass, k_init, f_y, xi, r_post)])
+    if np.any(r_post >= 1.0):
+        raise ValueError("r_post must be smaller than 1.0")
+    n_osc = mass.size
+    if analysis_dt is None:
+        analysis_dt = _BankDt(dt, mass, k_init)
+
+    # Ground motion at the end of every analysis step, same sign convention
+    # as the Path series of InelasticResponse
+    motion = np.asarray(motion, dtype=float)
+    analysis_time = (len(motion) - 1) * dt
+    n_steps = int(np.ceil(analysis_time / analysis_dt - 1.0e-9))
+    time = np.arange(1, n_steps + 1) * analysis_dt
+    accel_g = np.interp(time, np.arange(len(motion)) * dt, motion, right=0.0)
+
+    # Kinematic hardening modulus giving a post-yield tangent r_post * k_init
+    k_hard = r_post * k_init / (1.0 - r_post)
+    k_post = r_post * k_init
+    beta_k = 2 * xi / np.sqrt(k_init / mass)
+
+    # Newmark average acceleration constants
+    c_vel = 2.0 / analysis_dt
+    c_acc = 4.0 / analysis_dt ** 2
+
+    # Committed state of the bank
+    disp = np.zeros(n_osc)
+    vel = np.zeros(n_osc)
+    accel = np.zeros(n_osc)
+    plastic = np.zeros(n_osc)
+    back = np.zeros(n_osc)
+    k_commit = k_init.copy()
+
+    stacked = np.empty((len(CHANNELS), n_osc, n_steps))
+    stacked[0] = time
+
+    for step in range(n_steps):
+        load = mass * accel_g[step]
+        incr = np.zeros(n_osc)
+        force = stacked[4, :, step - 1] if step else np.zeros(n_osc)
+        k_tan = k_commit
+        for iteration in range(iterations):
+            if iteration:
+                # Vectorized return mapping from the committed state; the
+                # predictor keeps the committed force and tangent like Steel01
+                force = k_init * (disp + incr - plastic)
+                shifted = force - back
+                excess = np.abs(shifted) - f_y
+                yielding = excess > 0.0
+                slip = np.where(yielding, excess, 0.0) / (k_init + k_hard)
+                force -= k_init * slip * np.sign(shifted)
+                k_tan = np.where(yielding, k_post, k_init)
+
+            vel_new = c_vel * incr - vel
+            accel_new = c_acc * incr - 2 * c_vel * vel - accel
+            resid = (load - mass * accel_new - beta_k * k_tan * vel_new
+                     - force)
+            k_eff = k_tan * (1.0 + beta_k * c_vel) + mass * c_acc
+            corr = resid / k_eff
+            incr += corr
+            if 0.5 * np.max(np.abs(resid * corr)) < tol:
+                break
+
+        # Commit the converged state
+        force = k_init * (disp + incr - plastic)
+        shifted = force - back
+        excess = np.abs(shifted) - f_y
+        slip = np.where(excess > 0.0, excess, 0.0) / (k_init + k_hard)
+        direction = np.sign(shifted)
+        plastic += slip * direction
+        back += k_hard * slip * direction
+        force -= k_init * slip * direction
+        k_commit = np.where(excess > 0.0, k_post, k_init)
+        disp += incr
+        accel = c_acc * incr - 2 * c_vel * vel - accel
+        vel = c_vel * incr - vel
+        stacked[1:, :, step] = disp, vel, accel, force
+
+    if validate:
+        ValidateBank(stacked, mass, k_init, f_y, motion, dt, xi, r_post,
+                     validate, validate_tol, analysis_dt)
+
+    return stacked
+
+
+def ValidateBank(stacked, mass, k_init, f_y, motion, dt, xi, r_post, sample,
+                 tol=1.0e-3, analysis_dt=None):
+    """
+    Check a sample of the bank against InelasticResponse (OpenSees path)
+
+    :param stacked: array, output of BankResponse
+    :param mass: array, SDOF masses of the bank
+    :param k_init: array, spring stiffnesses of the bank
+    :param f_y: array, yield strengths of the bank
+    :param motion: list, acceleration values
+    :param dt: float, time step of acceleration values
+    :param xi: array, damping ratios of the bank
+    :param r_post: array, post-yield stiffness ratios of the bank
+    :param sample: int, number of oscillators to check
+    :param tol: float, allowed error relative to the peak of each channel
+    :param analysis_dt: float, time step of the analysis of the bank,
+        defaults to the automatic step of BankResponse
+    :return: array, worst relative error of each checked oscillator
+    """
+    from BilinearSDOF import InelasticResponse
+
+    n_osc = stacked.shape[1]
+    if analysis_dt is None:
+        analysis_dt = _BankDt(dt, mass, k_init)
+    picked = np.unique(np.linspace(0, n_osc - 1, min(sample, n_osc)).astype(int))
+    errors = np.empty(len(picked))
+    for i, osc in enumerate(picked):
+        outputs = InelasticResponse(mass[osc], k_init[osc], f_y[osc], motion,
+                                    dt, xi[osc], r_post[osc],
+                                    analysis_dt=analysis_dt)
+        worst = 0.0
+        for j, name in enumerate(CHANNELS[1:], 1):
+            ref = outputs[name]
+            peak = max(np.max(np.abs(ref)), np.finfo(float).tiny)
+            diff = np.max(np.abs(stacked[j, osc] - ref)) / peak
+            worst = max(worst, diff)
+        errors[i] = worst
+    if np.any(errors > tol):
+        raise RuntimeError("BankResponse: %i of %i validated oscillators "
+                           "deviate from InelasticResponse by more than %g"
+                           % (np.sum(errors > tol), len(picked), tol))
+    return errors
+
+
+def _BankDt(dt, mass, k_init):
+    # One time grid for the whole bank, fine enough for its shortest period
+    from BilinearSDOF import AnalysisDt
+
+    return AnalysisDt(dt, np.min(2 * np.pi * np.sqrt(mass / k_init)))
@@ -0,0 +1,213 @@
+import numpy as np
+import openseespy.opensees as op
+
+import GroundMotion
+from GroundMotion import PathFile
+from ResultCache import CachedResult, ResultKey
+
+# Output channels that InelasticResponse can collect
+CHANNELS = ("time", "rel_disp", "rel_vel", "rel_accel", "force")
+
+# Minimum number of analysis steps per elastic period for the automatic
+# analysis time step
+STEPS_PER_PERIOD = 100
+
+
+def InelasticResponse(mass, k_init, f_y, motion, dt, xi=0.05, r_post=0.0,
+                      outputs=CHANNELS, force_from="element", record_every=1,
+                      analysis_dt=None, motion_scale=1.0, cache=False):
+    """
+    Run seismic analysis of a nonlinear SDOF
+
+    :param mass: SDOF mass
+    :param k_init: spring stiffness
+    :param f_y: yield strength
+    :param motion: list, acceleration values
+    :param dt: float, time step of acceleration values
+    :param xi: damping ratio
+    :param r_post: post-yield stiffness
+    :param outputs: tuple, names of the channels to collect, see CHANNELS;
+        node queries of channels that are not requested are skipped
+    :param force_from: str, how the spring force is read: "element" (basic
+        force of the zeroLength element), "material" (material stress) or
+        "reaction" (node reaction, forms the reactions of the whole domain)
+    :param record_every: int, store only every k-th analysis step, or
+        "record" to store on the time grid of the acceleration values
+    :param analysis_dt: float, time step of the analysis; by default the
+        record dt divided into equal steps no longer than the elastic period
+        over STEPS_PER_PERIOD
+    :param motion_scale: float, amplitude scale factor of the motion
+    :param cache: True to serve repeated calls from the result cache, keyed
+        by the arguments, the motion values, this module, GroundMotion and
+        the OpenSeesPy version; "refresh" to compute again and replace the cached outputs,
+        see ResultCache
+    :return: dict of arrays, one per requested channel; every sample is
+        the state at the end of a stored analysis step, and "time" is the
+        time of that state, e.g. dt, 2 dt, ... with record_every="record"
+    """
+    unknown = set(outputs) - set(CHANNELS)
+    if unknown:
+        raise ValueError("unknown output channels: %s" % sorted(unknown))
+    if force_from not in ("element", "material", "reaction"):
+        raise ValueError("unknown force_from: %s" % force_from)
+    if cache:
+        params = {"mass": mass, "k_init": k_init, "f_y": f_y, "dt": dt,
+                  "xi": xi, "r_post": r_post, "outputs": list(outputs),
+                  "force_from": force_from, "record_every": record_every,
+                  "analysis_dt": analysis_dt, "motion_scale": motion_scale}
+        # GroundMotion writes the Path file the series reads
+        key = ResultKey(params, [np.asarray(motion, dtype=float)],
+                        [__file__, GroundMotion.__file__])
+        return CachedResult(key, lambda: InelasticResponse(
+            mass, k_init, f_y, motion, dt, xi, r_post, outputs, force_from,
+            record_every, analysis_dt, motion_scale), cache)
+
+    op.wipe()
+    op.model('basic', '-ndm', 2, '-ndf', 3)  # 2 dimensions, 3 dof per node
+
+    # Establish nodes
+    bot_node = 1
+    top_node = 2
+    op.node(bot_node, 0., 0.)
+    op.node(top_node, 0., 0.)
+
+    # Fix bottom node
+    op.fix(top_node, 0, 1, 1)
+    op.fix(bot_node, 1, 1, 1)
+    # Set out-of-plane DOFs to be slaved
+    op.equalDOF(1, 2, *[2, 3])
+
+    # nodal mass (weight / g):
+    op.mass(top_node, mass, 0., 0.)
+
+    # Define material
+    bilinear_mat_tag = 1
+    mat_type = "Steel01"
+    mat_props = [f_y, k_init, r_post]
+    op.uniaxialMaterial(mat_type, bilinear_mat_tag, *mat_props)
+
+    # Assign zero length element
+    beam_tag = 1
+    op.element('zeroLength', beam_tag, bot_node, top_node, "-mat",
+               bilinear_mat_tag, "-dir", 1, '-doRayleigh', 1)
+
+    # Define the dynamic analysis
+    load_tag_dynamic = 1
+    pattern_tag_dynamic = 1
+
+    # The record is handed over as a file written once per record; the
+    # factor should be negative
+    op.timeSeries('Path', load_tag_dynamic, '-dt', dt,
+                  '-filePath', PathFile(motion), '-factor', -motion_scale)
+    op.pattern('UniformExcitation', pattern_tag_dynamic,
+               1, '-accel', load_tag_dynamic)
+
+    # set damping based on first eigen mode
+    angular_freq = op.eigen('-fullGenLapack', 1)[0] ** 0.5
+    alpha_m = 0.0
+    beta_k = 2 * xi / angular_freq
+    beta_k_comm = 0.0
+    beta_k_init = 0.0
+
+    op.rayleigh(alpha_m, beta_k, beta_k_init, beta_k_comm)
+
+    # Run the dynamic analysis
+
+    op.wipeAnalysis()
+
+    op.algorithm('Newton')
+    op.system('SparseGeneral')
+    op.numberer('RCM')
+    op.constraints('Transformation')
+    op.integrator('Newmark', 0.5, 0.25)
+    op.analysis('Transient')
+
+    tol = 1.0e-10
+    iterations = 10
+    op.test('EnergyIncr', tol, iterations, 0, 2)
+    analysis_time = (len(motion) - 1) * dt
+    if analysis_dt is None:
+        analysis_dt = AnalysisDt(dt, 2 * np.pi / angular_freq)
+    n_steps = int(np.ceil(analysis_time / analysis_dt - 1.0e-9))
+    if record_every == "record":
+        record_every = int(round(dt / analysis_dt))
+        if abs(record_every * analysis_dt - dt) > 1.0e-9 * dt:
+            raise ValueError("record dt must be a multiple of the analysis dt")
+    # Number of completed analysis steps at each stored sample
+    stored = list(range(record_every, n_steps, record_every)) + [n_steps]
+
+    # Preallocate the requested channels; time is the end of the stored step,
+    # where its state is read
+    results = {item: np.empty(len(stored)) for item in outputs}
+    if "time" in results:
+        results["time"][:] = np.array(stored) * analysis_dt
+    rel_disp = results.get("rel_disp")
+    rel_vel = results.get("rel_vel")
+    rel_accel = results.get("rel_accel")
+    force = results.get("force")
+
+    # Only stored steps are queried, so the steps in between run as one block
+    done = 0
+    for j, block_end in enumerate(stored):
+        _Analyze(block_end - done, analysis_dt)
+        done = block_end
+        if rel_disp is not None:
+            rel_disp[j] = op.nodeDisp(top_node, 1)
+        if rel_vel is not None:
+            rel_vel[j] = op.nodeVel(top_node, 1)
+        if rel_accel is not None:
+            rel_accel[j] = op.nodeAccel(top_node, 1)
+        if force is not None:
+            if force_from == "element":
+                force[j] = op.basicForce(beam_tag)[0]
+            elif force_from == "material":
+                force[j] = op.eleResponse(beam_tag, 'material', '1',
+                                          'stress')[0]
+            else:
+                op.reactions()
+                # Negative since diff node
+                force[j] = -op.nodeReaction(bot_node, 1)
+    op.wipe()
+
+    return results
+
+
+def AnalysisDt(dt, period):
+    """
+    Automatic analysis time step of InelasticResponse
+
+    The record dt is divided into equal steps no longer than the period
+    over STEPS_PER_PERIOD, so the record values fall on analysis steps.
+
+    :param dt: float, time step of acceleration values
+    :param period: float, shortest elastic period to resolve
+    :return: float, time step of the analysis
+    """
+    return dt / max(1, int(np.ceil(dt * STEPS_PER_PERIOD / period)))
+
+
+def _Analyze(n_steps, analysis_dt):
+    """
+    Advance the transient analysis by n_steps of analysis_dt
+
+    The steps run as one analyze call; after a failure the remaining steps
+    run one at a time, and a failed step is retried with finer sub-steps.
+
+    :param n_steps: int, number of analysis steps
+    :param analysis_dt: float, time step of the analysis
+    """
+    start = op.getTime()
+    if op.analyze(n_steps, analysis_dt) == 0:
+        return
+    # analyze commits every step before the one that failed
+    done = int(round((op.getTime() - start) / analysis_dt))
+    for i in range(done, n_steps):
+        if op.analyze(1, analysis_dt) == 0:
+            continue
+        end = start + (i + 1) * analysis_dt
+        for n_sub in (4, 16):
+            if op.analyze(n_sub, (end - op.getTime()) / n_sub) == 0:
+                break
+        else:
+            raise RuntimeError("InelasticResponse: analysis failed at time %g"
+                               % op.getTime())
@@ -0,0 +1,201 @@
+import collections
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+
+# A parsed record: values is 1D for single-column and PEER AT2 files and 2D
+# (n_rows, n_columns) for multi-column files; dt and units are None when the
+# file does not state them
+Record = collections.namedtuple("Record", ["values", "dt", "units", "header"])
+
+# Suffix of the parsed copy and its metadata written next to the source file
+CACHE_SUFFIX = ".cache"
+# Version of the parser; caches written by another version are parsed again
+CACHE_VERSION = 2
+
+# PEER AT2 headers: "NPTS=  4684, DT=   .0100 SEC" (NGA) or
+# "4684   .0100   NPTS, DT" (older strong motion database)
+_at2_npts_dt = re.compile(r"NPTS\s*=\s*(\d+)\s*,?\s*DT\s*=\s*([-+.\dEe]+)",
+                          re.IGNORECASE)
+_at2_old = re.compile(r"^\s*(\d+)\s+([-+.\dEe]+)\s+NPTS", re.IGNORECASE)
+_at2_units = re.compile(r"UNITS\s+OF\s+([A-Za-z/0-9^*]+)", re.IGNORECASE)
+# dt encoded in file names such as test_motion_dt0p01.txt
+_name_dt = re.compile(r"dt(\d+)p(\d+)", re.IGNORECASE)
+
+# Path series files already written by this process, keyed by content hash
+_path_files = {}
+
+
+def LoadRecord(filename, dt=None, cache=True):
+    """
+    Load a ground motion or test record from a text file
+
+    Plain single-column files, multi-column files with leading header lines
+    and PEER AT2 files are recognised. The parsed values are cached as .npy
+    next to the source, keyed by the file hash and mtime, and repeat loads
+    are served as read-only memory maps, so processes loading the same
+    record share its pages through the OS page cache.
+
+    :param filename: str, path of the text file
+    :param dt: float, time step, overrides the one found in the file
+    :param cache: bool, use and update the cache next to the source
+    :return: Record
+    """
+    if not cache:
+        record = ParseRecord(filename)
+    else:
+        record = _LoadCached(filename)
+    if dt is not None:
+        record = record._replace(dt=dt)
+    return record
+
+
+def PathFile(values):
+    """
+    Text file holding the values for an OpenSees Path series
+
+    The values are written once per distinct content to the temporary
+    directory, so repeated analyses of the same record pass a file name to
+    timeSeries('Path', ..., '-filePath', name) instead of boxing every
+    value into the argument list. Sign and amplitude go into '-factor'.
+
+    :param values: list, series values
+    :return: str, path of the file
+    """
+    values = np.ascontiguousarray(values, dtype=float)
+    key = hashlib.sha1(values.tobytes()).hexdigest()
+    path = _path_files.get(key)
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(),
+                            "opensees_path_%s.txt" % key)
+        if not os.path.exists(path):
+            _WriteAtomic(path, lambda f: np.savetxt(f, values, "%.17g"), "wb")
+        _path_files[key] = path
+    return path
+
+
+def ParseRecord(filename):
+    """
+    Parse a record text file without the cache
+
+    A single-column file may start with the number of points; a first
+    integer line equal to the number of the values below it is header.
+
+    :param filename: str, path of the text file
+    :return: Record
+    """
+    with open(filename, errors="replace") as f:
+        lines = f.read().splitlines()
+
+    for i, line in enumerate(lines[:10]):
+        match = _at2_npts_dt.search(line) or _at2_old.search(line)
+        if match:
+            header = lines[:i + 1]
+            units = None
+            for text in header:
+                found = _at2_units.search(text)
+                if found:
+                    units = found.group(1).lower()
+            npts = int(match.group(1))
+            values = np.array(" ".join(lines[i + 1:]).split(), dtype=float)
+            return Record(values[:npts], float(match.group(2)), units, header)
+
+    # The data block is the longest tail of lines that all hold as many
+    # numbers as the last line; anything above it is header
+    body = [line for line in lines if line.strip()]
+    if not body:
+        raise ValueError("record file %s holds no values" % filename)
+    n_columns = len(body[-1].split())
+    start = len(body)
+    while start > 0 and _IsRow(body[start - 1], n_columns):
+        start -= 1
+    values = np.array(" ".join(body[start:]).split(), dtype=float)
+    if n_columns == 1 and _IsCount(body[start], len(values) - 1):
+        # A leading point count, e.g. "3\n0.1\n0.2\n0.3", is header
+        start += 1
+        values = values[1:]
+    if n_columns > 1:
+        values = values.reshape(-1, n_columns)
+
+    match = _name_dt.search(os.path.basename(filename))
+    file_dt = float("%s.%s" % match.groups()) if match else None
+    return Record(values, file_dt, None, body[:start])
+
+
+def _IsRow(line, n_columns):
+    fields = line.split()
+    if len(fields) != n_columns:
+        return False
+    try:
+        [float(x) for x in fields]
+    except ValueError:
+        return False
+    return True
+
+
+def _IsCount(line, count):
+    try:
+        return int(line.strip()) == count
+    except ValueError:
+        return False
+
+
+def _LoadCached(filename):
+    stat = os.stat(filename)
+    data_path = filename + CACHE_SUFFIX + ".npy"
+    meta_path = filename + CACHE_SUFFIX + ".json"
+
+    meta = None
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if (meta is not None and meta.get("version") == CACHE_VERSION
+            and os.path.exists(data_path)):
+        fresh = (meta.get("mtime_ns") == stat.st_mtime_ns
+                 and meta.get("size") == stat.st_size)
+        if not fresh and meta.get("sha1") == _FileHash(filename):
+            # Touched but unchanged, e.g. after a checkout
+            meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            try:
+                _WriteAtomic(meta_path, lambda f: json.dump(meta, f), "w")
+            except OSError:
+                pass
+            fresh = True
+        if fresh:
+            values = np.load(data_path, mmap_mode="r")
+            return Record(values, meta["dt"], meta["units"], meta["header"])
+
+    record = ParseRecord(filename)
+    meta = {"version": CACHE_VERSION, "sha1": _FileHash(filename), "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size, "dt": record.dt, "units": record.units,
+            "header": record.header}
+    try:
+        _WriteAtomic(data_path, lambda f: np.save(f, record.values), "wb")
+        _WriteAtomic(meta_path, lambda f: json.dump(meta, f), "w")
+    except OSError:
+        # Read-only location, serve the parsed values without caching
+        return record
+    return record._replace(values=np.load(data_path, mmap_mode="r"))
+
+
+def _FileHash(filename):
+    sha1 = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def _WriteAtomic(path, write, mode):
+    # Concurrent workers never see a half-written cache file
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp_path, mode) as f:
+        write(f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from importlib import metadata
+
+import numpy as np
+
+# Directory of the cached results, shared by all processes of the user
+CACHE_DIR = os.environ.get("OPENSEES_RESULT_CACHE",
+                           os.path.join(tempfile.gettempdir(),
+                                        "opensees_results"))
+# Size limit of the cache in bytes; the least recently used results are
+# removed beyond it
+MAX_SIZE = 512 * 1024 ** 2
+# Suffix of a cached result, one NumPy .npz archive per key
+RESULT_SUFFIX = ".npz"
+
+# Version of OpenSeesPy, part of every key
+_opensees_version = None
+
+
+def ResultKey(params, arrays=(), sources=()):
+    """
+    Key of an analysis: a hash of everything its outputs depend on
+
+    :param params: dict, analysis parameters, JSON serializable apart from
+        NumPy scalars and arrays
+    :param arrays: list of arrays, e.g. the record, hashed by their bytes
+    :param sources: list of file names defining the model, hashed by their
+        contents so editing the model invalidates its results
+    :return: str, hex digest
+    """
+    global _opensees_version
+    if _opensees_version is None:
+        try:
+            _opensees_version = metadata.version("openseespy")
+        except metadata.PackageNotFoundError:
+            _opensees_version = "unknown"
+
+    sha = hashlib.sha256()
+    sha.update(_opensees_version.encode())
+    sha.update(json.dumps(params, sort_keys=True, default=_JsonValue)
+               .encode())
+    for values in arrays:
+        values = np.ascontiguousarray(values)
+        sha.update(("%s%s" % (values.dtype.str, values.shape)).encode())
+        sha.update(values.tobytes())
+    for filename in sources:
+        with open(filename, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def CachedResult(key, compute, cache=True, cache_dir=None, max_size=MAX_SIZE):
+    """
+    Outputs of an analysis from the cache, computed and stored on a miss
+
+    :param key: str, key of the analysis, see ResultKey
+    :param compute: callable returning the outputs as a dict of arrays
+    :param cache: True to use the cache, False to bypass it, "refresh" to
+        compute again and replace the stored outputs
+    :param cache_dir: str, directory of the cache, defaults to CACHE_DIR
+    :param max_size: int, size limit of the cache in bytes
+    :return: dict of arrays
+    """
+    if not cache:
+        return compute()
+    if cache != "refresh":
+        outputs = LoadResult(key, cache_dir)
+        if outputs is not None:
+            return outputs
+    outputs = compute()
+    try:
+        StoreResult(key, outputs, cache_dir, max_size)
+    except OSError:
+        # Read-only or full location, serve the outputs without caching
+        pass
+    return outputs
+
+
+def LoadResult(key, cache_dir=None):
+    """
+    Stored outputs of an analysis
+
+    A hit marks the result as recently used.
+
+    :param key: str, key of the analysis, see ResultKey
+    :param cache_dir: str, directory of the cache, defaults to CACHE_DIR
+    :return: dict of arrays, None on a miss
+    """
+    path = _ResultPath(key, cache_dir)
+    try:
+        with np.load(path) as data:
+            outputs = {name: data[name] for name in data.files}
+        os.utime(path)
+    except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+        # Missing, or removed by another process while being read
+        return None
+    return outputs
+
+
+def StoreResult(key, outputs, cache_dir=None, max_size=MAX_SIZE):
+    """
+    Store the outputs of an analysis and trim the cache to max_size
+
+    The file is written under a temporary name and renamed, so concurrent
+    workers never read a half-written result.
+
+    :param key: str, key of the analysis, see ResultKey
+    :param outputs: dict of arrays
+    :param cache_dir: str, directory of the cache, defaults to CACHE_DIR
+    :param max_size: int, size limit of the cache in bytes, None for no
+        limit
+    :return: str, path of the stored result
+    """
+    path = _ResultPath(key, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **outputs)
+    os.replace(tmp_path, path)
+    if max_size is not None:
+        _Trim(os.path.dirname(path), max_size)
+    return path
+
+
+def ClearCache(key=None, cache_dir=None):
+    """
+    Invalidate one stored result or the whole cache
+
+    :param key: str, key of the analysis, None for all results
+    :param cache_dir: str, directory of the cache, defaults to CACHE_DIR
+    """
+    if key is not None:
+        paths = [_ResultPath(key, cache_dir)]
+    else:
+        paths = [path for path, size, mtime in _Entries(cache_dir or
+                                                        CACHE_DIR)]
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _ResultPath(key, cache_dir):
+    return os.path.join(cache_dir or CACHE_DIR, key + RESULT_SUFFIX)
+
+
+def _Entries(cache_dir):
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(RESULT_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def _Trim(cache_dir, max_size):
+    # Least recently used first; a hit touches the file
+    entries = sorted(_Entries(cache_dir), key=lambda entry: entry[2])
+    total = sum(size for path, size, mtime in entries)
+    for path, size, mtime in entries:
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Removed by another process trimming at the same time
+            pass
+        total -= size
+
+
+def _JsonValue(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return repr(value)
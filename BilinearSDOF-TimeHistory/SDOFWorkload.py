@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+RECORD = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      'test_motion_dt0p01.txt')
+
+
+def RunWorkload(record_points=None):
+    """
+    The SDOF of BilinearSDOF-TimeHistory.py as a benchmark workload
+
+    Run as a script, e.g. by the benchmark suite of C01SITC_BondSp, it
+    prints the metrics of one run as JSON, with the size knobs given as a
+    JSON argument.
+
+    :param record_points: int, length the record is cut or repeated to,
+        None for the whole record
+    :return: dict, ok, trials, failed_trials and steps of the analyze
+        calls, wall_time (s), steps_per_second, peak_rss (MB) and the
+        final displacement and force as a check of the response
+    """
+    start = time.perf_counter()
+    import openseespy.opensees as op
+    from BilinearSDOF import InelasticResponse
+    from GroundMotion import LoadRecord
+
+    record = LoadRecord(RECORD, 0.01)
+    motion = np.asarray(record.values)
+    if record_points is not None:
+        motion = np.resize(motion, record_points)
+
+    # InelasticResponse retries failed blocks itself, the trials are
+    # counted around op.analyze
+    counts = {"trials": 0, "failed_trials": 0, "steps": 0}
+    analyze = op.analyze
+
+    def CountedAnalyze(n_steps, *args):
+        ok = analyze(n_steps, *args)
+        counts["trials"] += 1
+        if ok == 0:
+            counts["steps"] += n_steps
+        else:
+            counts["failed_trials"] += 1
+        return ok
+
+    op.analyze = CountedAnalyze
+    try:
+        period = 1.0
+        mass = 1.0
+        k_init = 4 * np.pi ** 2 * mass / period ** 2
+        outputs = InelasticResponse(mass, k_init, 2.0, motion, record.dt,
+                                    0.05, 0.0, ("rel_disp", "force"))
+    finally:
+        op.analyze = analyze
+    wall_time = time.perf_counter() - start
+    return dict(counts, ok=0, wall_time=wall_time,
+                steps_per_second=counts["steps"] / wall_time,
+                peak_rss=_PeakRSS(),
+                final_disp=float(outputs["rel_disp"][-1]),
+                final_force=float(outputs["force"][-1]))
+
+
+def _PeakRSS():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 ** 2 if sys.platform == "darwin" else 1024)
+
+
+if __name__ == '__main__':
+    print(json.dumps(RunWorkload(**json.loads(sys.argv[1] if len(sys.argv)
+                                              > 1 else "{}"))))
@@ -0,0 +1,152 @@
+import collections
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+
+import numpy as np
+
+from GroundMotion import LoadRecord
+
+# Motions, output channels, result cache switch and resident memory cap of
+# the current worker process, set once by _InitWorker
+_worker_motions = None
+_worker_outputs = None
+_worker_cache = False
+_worker_memory = None
+
+
+def SweepGrid(period, f_y, xi=0.05, r_post=0.0, motion=0, mass=1.0,
+              scale=1.0):
+    """
+    Build the cases of a parameter sweep as the cartesian product of the axes
+
+    Every argument is either a single value or a list of values. The cases
+    are ordered like nested loops with `period` outermost and `scale`
+    innermost.
+
+    :param period: elastic periods of the SDOF
+    :param f_y: yield strengths
+    :param xi: damping ratios
+    :param r_post: post-yield stiffness ratios
+    :param motion: indices into the motions passed to RunSweep
+    :param mass: SDOF masses
+    :param scale: amplitude scale factors of the motion
+    :return: list of dict, one per case
+    """
+    names = ("period", "f_y", "xi", "r_post", "motion", "mass", "scale")
+    axes = [np.atleast_1d(v).tolist()
+            for v in (period, f_y, xi, r_post, motion, mass, scale)]
+    return [dict(zip(names, values)) for values in itertools.product(*axes)]
+
+
+def RunSweep(cases, motions, workers=None, chunksize=1,
+             max_tasks_per_worker=None, max_worker_memory=None, outputs=None,
+             cache=False):
+    """
+    Run InelasticResponse for every case across a pool of worker processes
+
+    OpenSeesPy keeps one domain per interpreter, so each worker process owns
+    its own OpenSees instance and runs one case at a time. Workers are
+    spawned, not forked, so their memory starts from a fresh interpreter
+    rather than a copy of the caller.
+
+    :param cases: list of dict, e.g. from SweepGrid
+    :param motions: list of (acceleration values, dt) tuples; the values may
+        also be a record file name (dt None to take it from the file), which
+        every worker loads as a shared memory map instead of a pickled copy
+    :param workers: int, number of worker processes, defaults to the CPUs
+    :param chunksize: int, number of cases submitted to a worker at once
+    :param max_tasks_per_worker: int, chunks run before a worker is replaced
+    :param max_worker_memory: float, resident memory of a worker in MB;
+        once a worker exceeds it after a chunk, no further chunks are
+        submitted, and when the chunks in flight are done the pool is
+        replaced by a fresh one. Needs /proc (Linux), ignored elsewhere
+    :param outputs: tuple, channels collected by InelasticResponse,
+        defaults to all of them
+    :param cache: result cache switch of InelasticResponse; cases computed
+        before, by any process, are then read from the cache
+    :return: generator of (case, outputs), in the order of `cases`
+    """
+    motions = [(values, dt) if isinstance(values, str)
+               else (np.asarray(values, dtype=float), dt)
+               for values, dt in motions]
+    # Parse and cache record files once before the workers map them
+    for values, dt in motions:
+        if isinstance(values, str):
+            LoadRecord(values)
+    workers = workers or os.cpu_count()
+    chunks = collections.deque(cases[i:i + chunksize]
+                               for i in range(0, len(cases), chunksize))
+    # Two chunks per worker keep every worker busy while results stream out
+    window = 2 * workers
+
+    pool = None
+    running = collections.deque()
+    try:
+        while chunks or running:
+            if pool is None:
+                pool = concurrent.futures.ProcessPoolExecutor(
+                    workers, multiprocessing.get_context("spawn"),
+                    initializer=_InitWorker,
+                    initargs=(motions, outputs, max_worker_memory, cache),
+                    max_tasks_per_child=max_tasks_per_worker)
+                retire = False
+            while chunks and not retire and len(running) < window:
+                chunk = chunks.popleft()
+                running.append((chunk, pool.submit(_RunChunk, chunk)))
+            chunk, future = running.popleft()
+            results, over_memory = future.result()
+            retire = retire or over_memory
+            for case, result in zip(chunk, results):
+                yield case, result
+            if retire and not running:
+                pool.shutdown()
+                pool = None
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def _InitWorker(motions, outputs, max_worker_memory, cache):
+    global _worker_motions, _worker_outputs, _worker_cache, _worker_memory
+    # Import OpenSees once per worker, not within the first case
+    import BilinearSDOF  # noqa: F401
+
+    _worker_motions = []
+    for values, dt in motions:
+        if isinstance(values, str):
+            record = LoadRecord(values, dt)
+            values, dt = record.values, record.dt
+        _worker_motions.append((values, dt))
+    _worker_outputs = outputs
+    _worker_cache = cache
+    _worker_memory = max_worker_memory
+
+
+def _RunChunk(chunk):
+    results = [_RunCase(case) for case in chunk]
+    memory = _ResidentMemory() if _worker_memory is not None else None
+    return results, memory is not None and memory > _worker_memory
+
+
+def _RunCase(case):
+    from BilinearSDOF import CHANNELS, InelasticResponse
+
+    values, dt = _worker_motions[case["motion"]]
+    k_init = 4 * np.pi ** 2 * case["mass"] / case["period"] ** 2
+    return InelasticResponse(case["mass"], k_init, case["f_y"], values, dt,
+                             case["xi"], case["r_post"],
+                             _worker_outputs or CHANNELS,
+                             motion_scale=case.get("scale", 1.0),
+                             cache=_worker_cache)
+
+
+def _ResidentMemory():
+    # Current resident memory in MB, None without /proc
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
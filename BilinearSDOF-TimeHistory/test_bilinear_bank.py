@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from BilinearBank import CHANNELS, BankResponse
+from BilinearSDOF import InelasticResponse
+
+
+def _Motion(n=300, dt=0.01):
+    return 0.5 * np.sin(2 * np.pi * np.arange(n) * dt / 0.7), dt
+
+
+@pytest.mark.parametrize("period", [0.1, 0.5, 1.0])
+def test_bank_matches_inelastic_response_by_default(period):
+    motion, dt = _Motion()
+    mass = 1.0
+    k_init = 4 * np.pi ** 2 * mass / period ** 2
+    f_y = 0.3 * k_init * 0.02
+    stacked = BankResponse(mass, k_init, f_y, motion, dt)
+    outputs = InelasticResponse(mass, k_init, f_y, motion, dt)
+    for j, name in enumerate(CHANNELS):
+        peak = np.max(np.abs(outputs[name]))
+        np.testing.assert_allclose(stacked[j, 0], outputs[name],
+                                   atol=1.0e-6 * peak)
+
+
+def test_mixed_bank_is_validated_on_its_own_time_grid():
+    motion, dt = _Motion()
+    period = np.array([0.1, 0.5, 1.0])
+    k_init = 4 * np.pi ** 2 / period ** 2
+    # Elastic, so the shortest period sets the only difference: the step
+    stacked = BankResponse(1.0, k_init, 1.0e6, motion, dt, validate=3,
+                           validate_tol=1.0e-9)
+    np.testing.assert_allclose(stacked[0, 0, :10], np.arange(1, 11) * 0.001)
@@ -0,0 +1,24 @@
+import numpy as np
+
+from BilinearSDOF import InelasticResponse
+
+
+def _Motion(n=200, dt=0.01):
+    return 0.3 * np.sin(2 * np.pi * np.arange(n) * dt), dt
+
+
+def test_decimated_time_is_the_record_grid():
+    motion, dt = _Motion()
+    outputs = InelasticResponse(1.0, 40.0, 0.2, motion, dt,
+                                record_every="record", analysis_dt=0.001)
+    n = len(motion) - 1
+    np.testing.assert_allclose(outputs["time"], np.arange(1, n + 1) * dt)
+
+
+def test_decimated_samples_match_the_full_history():
+    motion, dt = _Motion()
+    full = InelasticResponse(1.0, 40.0, 0.2, motion, dt, analysis_dt=0.001)
+    every = InelasticResponse(1.0, 40.0, 0.2, motion, dt, record_every=10,
+                              analysis_dt=0.001)
+    for name in ("time", "rel_disp", "force"):
+        np.testing.assert_array_equal(every[name], full[name][9::10])
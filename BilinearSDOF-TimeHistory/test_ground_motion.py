@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from GroundMotion import LoadRecord, ParseRecord
+
+
+def _Write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_single_column_with_dt_in_the_name(tmp_path):
+    record = ParseRecord(_Write(tmp_path, "motion_dt0p02.txt",
+                                "0.1\n-0.2\n\n0.3\n"))
+    np.testing.assert_array_equal(record.values, [0.1, -0.2, 0.3])
+    assert record.dt == 0.02
+    assert record.header == []
+
+
+def test_single_column_point_count_is_header(tmp_path):
+    record = ParseRecord(_Write(tmp_path, "motion.txt", "3\n1\n2\n3\n"))
+    np.testing.assert_array_equal(record.values, [1.0, 2.0, 3.0])
+    assert record.header == ["3"]
+
+
+def test_single_column_first_value_is_not_a_count(tmp_path):
+    record = ParseRecord(_Write(tmp_path, "motion.txt", "2\n1\n2\n3\n"))
+    np.testing.assert_array_equal(record.values, [2.0, 1.0, 2.0, 3.0])
+
+
+def test_multi_column_with_header(tmp_path):
+    record = ParseRecord(_Write(tmp_path, "test.txt",
+                                "disp force\nin kip\n0 0\n1 2.5\n-1 -2\n"))
+    np.testing.assert_array_equal(record.values,
+                                  [[0, 0], [1, 2.5], [-1, -2]])
+    assert record.header == ["disp force", "in kip"]
+    assert record.dt is None
+
+
+def test_peer_at2(tmp_path):
+    text = ("PEER NGA STRONG MOTION DATABASE RECORD\n"
+            "SOME EVENT, STATION 000\n"
+            "ACCELERATION TIME SERIES IN UNITS OF G\n"
+            "NPTS=    5, DT=   .0050 SEC\n"
+            "  .1E-02  .2E-02  .3E-02  .4E-02\n"
+            "  .5E-02\n")
+    record = ParseRecord(_Write(tmp_path, "RSN1.AT2", text))
+    np.testing.assert_allclose(record.values, [1e-3, 2e-3, 3e-3, 4e-3, 5e-3])
+    assert record.dt == 0.005
+    assert record.units == "g"
+    assert len(record.header) == 4
+
+
+@pytest.mark.parametrize("text", ["", "\n  \n"])
+def test_empty_file(tmp_path, text):
+    path = _Write(tmp_path, "empty.txt", text)
+    with pytest.raises(ValueError, match="empty.txt"):
+        ParseRecord(path)
+
+
+def test_cached_load_is_a_memory_map(tmp_path):
+    path = _Write(tmp_path, "motion_dt0p01.txt", "0.1\n0.2\n")
+    first = LoadRecord(path)
+    second = LoadRecord(path)
+    assert isinstance(second.values, np.memmap)
+    np.testing.assert_array_equal(first.values, second.values)
+    assert LoadRecord(path, dt=0.5).dt == 0.5
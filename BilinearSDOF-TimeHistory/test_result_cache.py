@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+
+from ResultCache import (CachedResult, ClearCache, LoadResult, ResultKey,
+                         StoreResult)
+
+
+def test_key_follows_the_source_files(tmp_path):
+    source = tmp_path / "model.py"
+    source.write_text("k = 1\n")
+    key = ResultKey({"a": 1}, [np.arange(3.0)], [str(source)])
+    assert ResultKey({"a": 1}, [np.arange(3.0)], [str(source)]) == key
+    source.write_text("k = 2\n")
+    assert ResultKey({"a": 1}, [np.arange(3.0)], [str(source)]) != key
+
+
+def test_key_follows_params_and_arrays():
+    key = ResultKey({"a": 1}, [np.arange(3.0)])
+    assert ResultKey({"a": 2}, [np.arange(3.0)]) != key
+    assert ResultKey({"a": 1}, [np.arange(4.0)]) != key
+    assert ResultKey({"a": 1}, [np.arange(3)]) != key
+
+
+def test_key_of_values_json_does_not_know():
+    # NumPy values hash as their lists, anything else by its repr
+    assert (ResultKey({"a": np.array([1.0, 2.0])})
+            == ResultKey({"a": [1.0, 2.0]}))
+    assert ResultKey({"a": np.float64(0.5)}) == ResultKey({"a": 0.5})
+    assert ResultKey({"a": 1 + 2j}) == ResultKey({"a": 1 + 2j})
+    assert ResultKey({"a": 1 + 2j}) != ResultKey({"a": 1 + 3j})
+    assert ResultKey({"a": 1 + 2j}) == ResultKey({"a": "(1+2j)"})
+
+
+def test_cached_result(tmp_path):
+    calls = []
+
+    def Compute():
+        calls.append(1)
+        return {"x": np.arange(4.0)}
+
+    for cache in (True, True, "refresh", False):
+        outputs = CachedResult("key", Compute, cache, str(tmp_path))
+        np.testing.assert_array_equal(outputs["x"], np.arange(4.0))
+    assert len(calls) == 3
+    ClearCache("key", str(tmp_path))
+    assert LoadResult("key", str(tmp_path)) is None
+
+
+def test_least_recently_used_are_evicted(tmp_path):
+    cache_dir = str(tmp_path)
+    outputs = {"x": np.zeros(1000)}
+    paths = [StoreResult(key, outputs, cache_dir, None)
+             for key in ("a", "b")]
+    size = os.path.getsize(paths[0])
+    # a older than b, then a is read and becomes the most recent
+    for i, path in enumerate(paths):
+        os.utime(path, ns=(10 ** 9 * (i + 1), 10 ** 9 * (i + 1)))
+    assert LoadResult("a", cache_dir) is not None
+    StoreResult("c", outputs, cache_dir, 2 * size)
+    assert LoadResult("a", cache_dir) is not None
+    assert LoadResult("b", cache_dir) is None
+    assert LoadResult("c", cache_dir) is not None
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from BilinearSDOF import InelasticResponse
+from SweepRunner import RunSweep, SweepGrid
+
+RECORD = "test_motion_dt0p01.txt"
+
+
+@pytest.fixture(scope="module")
+def record(request):
+    return str(request.path.parent / RECORD), 0.01
+
+
+def _Direct(case, record):
+    from GroundMotion import LoadRecord
+
+    motion = LoadRecord(*record)
+    k_init = 4 * np.pi ** 2 * case["mass"] / case["period"] ** 2
+    return InelasticResponse(case["mass"], k_init, case["f_y"],
+                             motion.values, motion.dt, case["xi"],
+                             case["r_post"])
+
+
+def test_grid_order():
+    cases = SweepGrid([0.5, 1.0], [1.0, 2.0])
+    assert [(c["period"], c["f_y"]) for c in cases] == [
+        (0.5, 1.0), (0.5, 2.0), (1.0, 1.0), (1.0, 2.0)]
+
+
+@pytest.mark.parametrize("options", [
+    {}, {"chunksize": 2, "max_tasks_per_worker": 1},
+    {"max_worker_memory": 1.0}])
+def test_sweep_matches_direct_calls_in_order(record, options):
+    cases = SweepGrid([0.5, 1.0], 2.0)
+    results = list(RunSweep(cases, [record], workers=2, **options))
+    assert [case for case, _ in results] == cases
+    for case, outputs in results:
+        expected = _Direct(case, record)
+        for name, values in expected.items():
+            np.testing.assert_array_equal(outputs[name], values)
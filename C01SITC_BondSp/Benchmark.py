@@ -0,0 +1,306 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from importlib import metadata
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# The workloads of the suite: the SDOF of BilinearSDOF-TimeHistory.py, the
+# column of C01SITC_BondSp.py and the column of test_concreteCM_unsolved.py
+WORKLOADS = ("sdof", "c01", "concrete_cm")
+
+# Size knobs of each workload; the defaults run them as the scripts do.
+# None for record_points and protocol_points means the whole record and
+# the whole measured protocol
+SIZES = {
+    "sdof": {"record_points": None},
+    "c01": {"protocol_points": None, "fiber_scale": 1.0},
+    "concrete_cm": {"cycles": 2, "amplitude": 100.0, "fiber_scale": 1.0},
+}
+
+# The SDOF workload belongs to the other widget; it runs as a script in a
+# process of its own, see SDOFWorkload.py there
+SDOF_WORKLOAD = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'BilinearSDOF-TimeHistory',
+                             'SDOFWorkload.py')
+
+# Relative increase of wall time and peak RSS over the baseline reported
+# as a regression
+TIME_TOLERANCE = 0.10
+RSS_TOLERANCE = 0.10
+
+
+def RunBenchmark(workloads=WORKLOADS, sizes=None, repeat=3):
+    """
+    Run the benchmark workloads, each repeat in a fresh process
+
+    A fresh process per run gives every run its own OpenSees domain and its
+    own peak RSS. The wall time is the fastest of the repeats, which is the
+    least disturbed by other load on the machine.
+
+    :param workloads: names of the workloads to run, see WORKLOADS
+    :param sizes: dict of workload name: dict of size knobs overriding
+        SIZES
+    :param repeat: int, number of runs of each workload
+    :return: dict with the environment and the metrics of every workload:
+        ok, wall_time (s), steps, steps_per_second, trials, failed_trials,
+        peak_rss (MB) and the final force and displacement as a check of
+        the response
+    """
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        raise ValueError("unknown workloads: %s" % sorted(unknown))
+    sizes = sizes or {}
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in workloads:
+        size = dict(SIZES[name], **sizes.get(name, {}))
+        runs = []
+        for _ in range(repeat):
+            if name == "sdof":
+                runs.append(_RunSDOF(size))
+                continue
+            with context.Pool(1) as pool:
+                runs.append(pool.apply(_RunWorkload, (name, size)))
+        best = min(runs, key=lambda run: run["wall_time"])
+        best["peak_rss"] = max(run["peak_rss"] for run in runs)
+        best["size"] = size
+        best["repeat"] = repeat
+        results[name] = best
+    return {"environment": Environment(), "workloads": results}
+
+
+def CompareBenchmark(current, baseline, time_tolerance=TIME_TOLERANCE,
+                     rss_tolerance=RSS_TOLERANCE):
+    """
+    Compare benchmark results with a stored baseline
+
+    Workloads run at different sizes are not compared. Wall time, steps per
+    second and peak RSS are regressions beyond their tolerance; any
+    increase of the failed trials or a change of ok is a regression.
+
+    :param current: dict, results of RunBenchmark
+    :param baseline: dict, results of RunBenchmark, e.g. from LoadBaseline
+    :param time_tolerance: float, allowed relative slowdown
+    :param rss_tolerance: float, allowed relative increase of peak RSS
+    :return: list of (workload, metric, baseline, current, status), status
+        is "ok", "regression", "improvement" or "skipped"
+    """
+    rows = []
+    for name, now in current["workloads"].items():
+        before = baseline["workloads"].get(name)
+        if before is None or before["size"] != now["size"]:
+            rows.append((name, "size", before and before["size"],
+                         now["size"], "skipped"))
+            continue
+        rows.append((name, "ok", before["ok"], now["ok"],
+                     "ok" if before["ok"] == now["ok"] else "regression"))
+        for metric, tolerance, sense in (
+                ("wall_time", time_tolerance, 1),
+                ("steps_per_second", time_tolerance, -1),
+                ("peak_rss", rss_tolerance, 1),
+                ("failed_trials", 0.0, 1)):
+            old, new = before[metric], now[metric]
+            change = sense * (new - old) / old if old else sense * new
+            if change > tolerance:
+                status = "regression"
+            elif change < -tolerance:
+                status = "improvement"
+            else:
+                status = "ok"
+            rows.append((name, metric, old, new, status))
+    return rows
+
+
+def Environment():
+    """
+    Versions and machine the benchmark runs on
+
+    :return: dict
+    """
+    return {"python": platform.python_version(),
+            "openseespy": _Version("openseespy"),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpus": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def SaveBaseline(filename, results):
+    """
+    Store benchmark results as a JSON baseline
+
+    :param filename: str, path of the JSON file
+    :param results: dict, results of RunBenchmark
+    :return: str, filename
+    """
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=1)
+    return filename
+
+
+def LoadBaseline(filename):
+    """
+    Load a JSON baseline written by SaveBaseline
+
+    :param filename: str, path of the JSON file
+    :return: dict
+    """
+    with open(filename) as f:
+        return json.load(f)
+
+
+def _Version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _RunWorkload(name, size):
+    run = {"c01": _RunC01, "concrete_cm": _RunConcreteCM}[name]
+    start = time.perf_counter()
+    metrics = run(**size)
+    metrics["wall_time"] = time.perf_counter() - start
+    metrics["steps_per_second"] = metrics["steps"] / metrics["wall_time"]
+    metrics["peak_rss"] = _PeakRSS()
+    return metrics
+
+
+def _RunSDOF(size):
+    # The script prints its metrics as the last line
+    output = subprocess.run([sys.executable, SDOF_WORKLOAD, json.dumps(size)],
+                            stdout=subprocess.PIPE, check=True,
+                            universal_newlines=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _RunC01(protocol_points, fiber_scale):
+    import ColumnModel
+    import SmartAnalyze
+
+    disp, force = ColumnModel.ExpData()
+    protocol = SmartAnalyze.ReversalPoints(disp * ColumnModel.INCH)[0]
+    if protocol_points is not None:
+        protocol = protocol[:protocol_points]
+    node, dof = ColumnModel.C01Column(fiber_scale=fiber_scale)
+    return _RunPushover(node, dof, protocol)
+
+
+def _RunConcreteCM(cycles, amplitude, fiber_scale):
+    import ColumnModel
+
+    protocol = [amplitude, -amplitude] * cycles + [0.0]
+    node, dof = ColumnModel.ConcreteCMColumn(fiber_scale=fiber_scale)
+    return _RunPushover(node, dof, protocol)
+
+
+def _RunPushover(node, dof, protocol):
+    import ColumnModel
+
+    # The control settings of the scripts, which sample no probes; only the
+    # log is silenced and the profile is collected for the trial counts
+    profile = {}
+    ok, results = ColumnModel.Pushover(node, dof, protocol, control={
+        "profile": True, "profileFile": profile}, history=False)
+    return {"ok": ok, "trials": profile["analyzeCalls"],
+            "failed_trials": profile["failed"],
+            # analysis steps, a converged block counts as its steps
+            "steps": profile["converged"] - profile["blocks"]
+            + profile["failedBlocks"] + profile["blockSteps"],
+            "final_disp": float(results["disp"][-1]),
+            "final_force": float(results["force"][-1])}
+
+
+def _PeakRSS():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 ** 2 if sys.platform == "darwin" else 1024)
+
+
+def ParseArguments(argv=None):
+    """
+    Parse the command line of the benchmark
+
+    :param argv: list of str, the arguments, defaults to sys.argv[1:]
+    :return: argparse.Namespace; workloads defaults to all of WORKLOADS
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the applet workloads and compare them with a "
+                    "stored baseline")
+    parser.add_argument("workloads", nargs="*",
+                        help="any of %s, defaults to all of them"
+                             % ", ".join(WORKLOADS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--record-points", type=int)
+    parser.add_argument("--protocol-points", type=int)
+    parser.add_argument("--fiber-scale", type=float)
+    parser.add_argument("--cycles", type=int)
+    parser.add_argument("--amplitude", type=float)
+    parser.add_argument("--save", help="store the results as a baseline")
+    parser.add_argument("--compare", help="baseline to compare with")
+    parser.add_argument("--time-tolerance", type=float,
+                        default=TIME_TOLERANCE)
+    parser.add_argument("--rss-tolerance", type=float, default=RSS_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.workloads if name not in WORKLOADS]
+    if unknown:
+        parser.error("unknown workloads %s, choose from %s"
+                     % (", ".join(unknown), ", ".join(WORKLOADS)))
+    args.workloads = args.workloads or list(WORKLOADS)
+    return args
+
+
+def Main(argv=None):
+    """
+    Run the benchmark from the command line, see ParseArguments
+
+    :param argv: list of str, the arguments, defaults to sys.argv[1:]
+    :return: int, exit code, 1 if a regression against the baseline was
+        found
+    """
+    args = ParseArguments(argv)
+    sizes = {}
+    for name in WORKLOADS:
+        knobs = {knob: getattr(args, knob) for knob in SIZES[name]
+                 if getattr(args, knob) is not None}
+        sizes[name] = knobs
+    results = RunBenchmark(args.workloads, sizes, args.repeat)
+
+    for name, metrics in results["workloads"].items():
+        print("%-12s ok %2i  %8.3f s  %10.1f steps/s  %5i failed trials  "
+              "%7.1f MB" % (name, metrics["ok"], metrics["wall_time"],
+                            metrics["steps_per_second"],
+                            metrics["failed_trials"], metrics["peak_rss"]
+                            or 0.0))
+    if args.save:
+        SaveBaseline(args.save, results)
+    if args.compare:
+        rows = CompareBenchmark(results, LoadBaseline(args.compare),
+                                args.time_tolerance, args.rss_tolerance)
+        for name, metric, old, new, status in rows:
+            if isinstance(old, float) or isinstance(new, float):
+                old, new = "%.4g" % old, "%.4g" % new
+            print("%-12s %-17s %10s -> %-10s %s"
+                  % (name, metric, old, new, status))
+        return int(any(row[-1] == "regression" for row in rows))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(Main())
@@ -1,8 +1,11 @@
 import openseespy.opensees as ops
-import numpy as np
 import os
 
-expdata = np.loadtxt('exp.txt', skiprows = 2)
+from GroundMotion import LoadRecord
+from FiberSection import RectSection
+
+expdata = LoadRecord(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   'exp.txt')).values
 dexp = expdata[:, 0]
 
 # Units: N mm MPa
@@ -86,35 +89,12 @@ ops.uniaxialMaterial('Concrete01', 6, -1.15 * fc, -0.005, -0.8 * 1.15 * fc, -0.0
 # Section Definition
 # ======================================================
 ## Column Section
-# ops.section('Fiber', secTag, '-GJ', GJ)
-ops.section('Fiber', 1)
-# ops.patch('rect', matTag, numSubdivY, numSubdivZ, *crdsI, *crdsJ)
-ops.patch('rect', 2, 10, 10, Width / 2 - Cover, Width / 2 - Cover, -Width / 2 + Cover, -Width / 2 + Cover)
-ops.patch('rect', 1, 10, 1, Width / 2, Width / 2, -Width / 2, Width / 2 - Cover)
-ops.patch('rect', 1, 10, 1, Width / 2, -Width / 2 + Cover, -Width / 2, -Width / 2)
-ops.patch('rect', 1, 1, 8, -Width / 2 + Cover, Width / 2 - Cover, -Width / 2, -Width / 2 + Cover)
-ops.patch('rect', 1, 1, 8, Width / 2, Width / 2 - Cover, Width / 2 - Cover, -Width / 2 + Cover)
-# ops.layer('straight', matTag, numFiber, areaFiber, *start, *end)
-ops.layer('straight', 3, 4, 0.25 * np.pi * dlongi**2, -Width / 2 + Cover + dlongi / 2, Width / 2 - Cover - dlongi / 2, Width / 2 - Cover - dlongi / 2, Width / 2 - Cover - dlongi / 2)
-ops.layer('straight', 3, 4, 0.25 * np.pi * dlongi**2, -Width / 2 + Cover + dlongi / 2, -Width / 2 + Cover + dlongi / 2, Width / 2 - Cover - dlongi / 2, -Width / 2 + Cover + dlongi / 2)
-ops.layer('straight', 3, 2, 0.25 * np.pi * dlongi**2, -Width / 2 + Cover + dlongi / 2, Width / 2 - Cover - 1 / 3 * (Width - 2 * Cover - dlongi) - dlongi / 2, Width / 2 - Cover - dlongi / 2, Width / 2 - Cover - 1 / 3 * (Width - 2 * Cover - dlongi) - dlongi / 2)
-ops.layer('straight', 3, 2, 0.25 * np.pi * dlongi**2, -Width / 2 + Cover + dlongi / 2, -Width / 2 + Cover + 1 / 3 * (Width - 2 * Cover - dlongi) + dlongi / 2, Width / 2 - Cover - dlongi / 2, -Width / 2 + Cover + 1 / 3 * (Width - 2 * Cover - dlongi) + dlongi / 2)
+# RectSection(sec_tag, width, depth, cover, core_mat, cover_mat, bar_mat, bar_diameter, bars_y=4, bars_z=4, fiber_size=None)
+# emits the 10x10 core, the four cover patches and the 4x4 perimeter bars; give fiber_size for another mesh
+RectSection(1, Width, Width, Cover, 2, 1, 3, dlongi)
 
 ## Bond Slip
-# ops.section('Fiber', secTag, '-GJ', GJ)
-ops.section('Fiber', 2)
-# ops.patch('rect', matTag, numSubdivY, numSubdivZ, *crdsI, *crdsJ)
-ops.patch('rect', 6, 10, 10, Width / 2 - Cover, Width / 2 - Cover, -Width / 2 + Cover, -Width / 2 + Cover)
-ops.patch('rect', 1, 10, 1, Width / 2, Width / 2, -Width / 2, Width / 2 - Cover)
-ops.patch('rect', 1, 10, 1, Width / 2, -Width / 2 + Cover, -Width / 2, -Width / 2)
-ops.patch('rect', 1, 1, 8, -Width / 2 + Cover, Width / 2 - Cover, -Width / 2, -Width / 2 + Cover)
-ops.patch('rect', 1, 1, 8, Width / 2, Width / 2 - Cover, Width / 2 - Cover, -Width / 2 + Cover)
-# ops.layer('straight', matTag, numFiber, areaFiber, *start, *end)
-ops.layer('straight', 4, 4, 0.25 * np.pi * dlongi**2, -Width / 2 + Cover + dlongi / 2, Width / 2 - Cover - dlongi / 2, Width / 2 - Cover - dlongi / 2, Width / 2 - Cover - dlongi / 2)
-ops.layer('straight', 4, 4, 0.25 * np.pi * dlongi**2, -Width / 2 + Cover + dlongi / 2, -Width / 2 + Cover + dlongi / 2, Width / 2 - Cover - dlongi / 2, -Width / 2 + Cover + dlongi / 2)
-ops.layer('straight', 4, 2, 0.25 * np.pi * dlongi**2, -Width / 2 + Cover + dlongi / 2, Width / 2 - Cover - 1 / 3 * (Width - 2 * Cover - dlongi) - dlongi / 2, Width / 2 - Cover - dlongi / 2, Width / 2 - Cover - 1 / 3 * (Width - 2 * Cover - dlongi) - dlongi / 2)
-ops.layer('straight', 4, 2, 0.25 * np.pi * dlongi**2, -Width / 2 + Cover + dlongi / 2, -Width / 2 + Cover + 1 / 3 * (Width - 2 * Cover - dlongi) + dlongi / 2, Width / 2 - Cover - dlongi / 2, -Width / 2 + Cover + 1 / 3 * (Width - 2 * Cover - dlongi) + dlongi / 2)
-
+RectSection(2, Width, Width, Cover, 6, 1, 4, dlongi)
 
 ## ops.section('Aggregator', secTag, *mats, '-section', sectionTag)
 ops.section('Aggregator', 3, 5, 'Vy', '-section', 2)
@@ -188,7 +168,8 @@ ops.loadConst('-time', 0)
 
 # Monotonic Lateral Loadcase
 # ======================================================
-os.remove('out_01SITC_full.txt')
+if os.path.exists('out_01SITC_full.txt'):
+    os.remove('out_01SITC_full.txt')
 ops.recorder('Node', '-file', 'out_01SITC_full.txt', '-time', '-node', 7, '-dof', 1, 'disp')
 # ops.timeSeries('Linear', tag, '-factor', factor=1.0, '-tStart', tStart=0.0)
 ops.timeSeries('Linear', 2)
@@ -202,7 +183,9 @@ ops.numberer('Plain')
 ops.system('BandGen')
 
 import SmartAnalyze
-protocol = dexp * inch
+# Analyze between the reversal points of the measured history only;
+# expdata[reversal_index] are the measured samples at those points
+protocol, reversal_index = SmartAnalyze.ReversalPoints(dexp * inch)
 # protocol = [100 * inch]
 ## SmartAnalyze.SmartAnalyzeStatic(node, dof, maxStep, targets)
 SmartAnalyze.SmartAnalyzeStatic(7, 1, 0.1, protocol)
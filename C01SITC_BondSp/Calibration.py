@@ -0,0 +1,233 @@
+import collections
+import csv
+import multiprocessing
+import time
+
+import numpy as np
+
+import ColumnModel
+import SmartAnalyze
+
+# Free parameters of ColumnModel.C01Column and their default bounds
+BOUNDS = {
+    "factor": (1.0, 2.0),          # scale of the Bond_SP01 strengths
+    "b": (0.3, 0.5),               # Bond_SP01 stiffness reduction factor
+    "R": (0.5, 1.0),               # Bond_SP01 pinching factor
+    "end_strain_sitc": (0.005, 0.05),  # Concrete01WithSITC endStrainSITC
+}
+
+# Result of Calibrate: the best parameter set, its error and one entry per
+# evaluated candidate
+Fit = collections.namedtuple("Fit", ["params", "error", "log"])
+
+# Measured history, protocol and best error so far of the current worker
+# process, set once by _InitWorker
+_worker_test = None
+_worker_best = None
+
+
+def TestData(protocol_points=None):
+    """
+    The measured history of exp.txt in the units of the C01 model
+
+    :param protocol_points: int, use only the first reversal points of the
+        history, None for all of them
+    :return: dict with the protocol (reversal points, inch), the branch
+        start of every target, and the measured disp (inch), force (kip)
+        and branch of every sample on those branches
+    """
+    disp, force = ColumnModel.ExpData()
+    disp = disp * ColumnModel.INCH
+    force = force * 1000 * ColumnModel.KIP
+    protocol, indices = SmartAnalyze.ReversalPoints(disp)
+    if protocol_points is not None:
+        protocol = protocol[:protocol_points]
+        indices = indices[:protocol_points]
+    n = indices[-1] + 1
+    return {"protocol": protocol,
+            "starts": np.concatenate(([0.0], protocol[:-1])),
+            "disp": disp[:n], "force": force[:n],
+            "branch": np.searchsorted(indices, np.arange(n))}
+
+
+def HysteresisError(disp, force, branch, test, n_branches=None):
+    """
+    Force error of a simulated hysteresis at the measured displacements
+
+    Both histories are split into the branches between reversal points. On
+    every branch the simulated force is interpolated at the measured
+    displacements; the branches are laid end to end on one axis of
+    distance from the branch start, so all of them take a single np.interp.
+
+    :param disp: array, simulated displacements, including the start point
+        of every branch
+    :param force: array, simulated forces
+    :param branch: array, branch of every simulated sample
+    :param test: dict, measured history, see TestData
+    :param n_branches: int, compare only the first branches; the squared
+        errors are still divided by all measured samples, so the error of
+        the first branches never exceeds the error of the whole history
+    :return: float, root mean square force error over the peak measured
+        force
+    """
+    starts = test["starts"]
+    exp_branch = test["branch"]
+    exp_disp = test["disp"]
+    exp_force = test["force"]
+    if n_branches is not None:
+        used = exp_branch < n_branches
+        exp_branch, exp_disp, exp_force = (exp_branch[used], exp_disp[used],
+                                           exp_force[used])
+
+    # Longer than any branch, so the branches do not overlap on the axis
+    width = 2 * np.abs(starts).max() + 2 * np.abs(disp).max() + 1.0
+    axis = branch * width + np.abs(disp - starts[branch])
+    exp_axis = exp_branch * width + np.abs(exp_disp - starts[exp_branch])
+    simulated = np.interp(exp_axis, axis, force)
+    squared = np.sum((simulated - exp_force) ** 2)
+    return float((squared / len(test["disp"])) ** 0.5
+                 / np.abs(test["force"]).max())
+
+
+def Calibrate(bounds=None, samples=16, rounds=3, shrink=0.5, workers=None,
+              seed=0, fixed=None, protocol_points=None, check_every=5,
+              log_file=None):
+    """
+    Fit the C01 column to exp.txt over a process pool
+
+    Every round draws a Latin hypercube sample of the bounds and evaluates
+    the candidates concurrently; the next round samples bounds shrunk
+    around the best candidate so far. A candidate is abandoned as soon as
+    the error of its completed branches exceeds the best error of any
+    finished candidate, see HysteresisError.
+
+    :param bounds: dict of name: (low, high) of the free parameters of
+        ColumnModel.C01Column, defaults to BOUNDS
+    :param samples: int, candidates per round
+    :param rounds: int, number of rounds
+    :param shrink: float, width of the bounds of a round relative to the
+        previous one
+    :param workers: int, number of worker processes, defaults to the CPUs
+    :param seed: int, seed of the sampling
+    :param fixed: dict, further keyword arguments of C01Column
+    :param protocol_points: int, fit only the first reversal points of
+        exp.txt, None for the whole history
+    :param check_every: int, branches between two checks of the running
+        error
+    :param log_file: str, CSV file the evaluation log is written to
+    :return: Fit
+    """
+    bounds = dict(bounds or BOUNDS)
+    names = sorted(bounds)
+    low = np.array([bounds[name][0] for name in names], dtype=float)
+    high = np.array([bounds[name][1] for name in names], dtype=float)
+    rng = np.random.default_rng(seed)
+    test = TestData(protocol_points)
+
+    best = multiprocessing.Value("d", np.inf)
+    pool = multiprocessing.Pool(workers, _InitWorker,
+                                (test, fixed or {}, best, check_every))
+    log = []
+    best_params = None
+    best_error = np.inf
+    try:
+        for round_index in range(rounds):
+            # Latin hypercube: one candidate per stratum of every parameter
+            strata = np.argsort(rng.random((len(names), samples)), axis=1).T
+            points = low + (strata + rng.random(strata.shape)) / samples * (
+                high - low)
+            tasks = [(round_index, dict(zip(names, point.tolist())))
+                     for point in points]
+            for entry in pool.imap_unordered(_Evaluate, tasks):
+                log.append(entry)
+                if entry["complete"] and (best_params is None
+                                          or entry["error"] < best_error):
+                    best_params = entry["params"]
+                    best_error = entry["error"]
+            if best_params is None:
+                continue
+            center = np.array([best_params[name] for name in names])
+            half = (high - low) * shrink / 2
+            low, high = (np.maximum(center - half, low),
+                         np.minimum(center + half, high))
+    finally:
+        pool.terminate()
+        pool.join()
+
+    if log_file is not None:
+        _WriteLog(log_file, log, names)
+    return Fit(best_params, best_error, log)
+
+
+def _InitWorker(test, fixed, best, check_every):
+    global _worker_test, _worker_best
+    _worker_test = dict(test, fixed=fixed, check_every=check_every)
+    _worker_best = best
+
+
+def _Evaluate(task):
+    round_index, params = task
+    test = _worker_test
+    start = time.perf_counter()
+    node, dof = ColumnModel.C01Column(**dict(test["fixed"], **params))
+
+    # Simulated samples with the start point of every branch
+    disp = [np.zeros(1)]
+    force = [np.zeros(1)]
+    branch = [np.zeros(1, dtype=int)]
+    last_force = 0.0
+    n_branches = 0
+    error = np.inf
+    ok = 0
+    for k, (ok, results) in enumerate(ColumnModel.Branches(
+            node, dof, test["protocol"])):
+        if ok < 0:
+            break
+        if k > 0:
+            disp.append(test["starts"][k:k + 1])
+            force.append(np.array([last_force]))
+            branch.append(np.array([k]))
+        if len(results["disp"]):
+            disp.append(results["disp"])
+            force.append(results["force"])
+            branch.append(np.full(len(results["disp"]), k))
+            last_force = results["force"][-1]
+        n_branches = k + 1
+        if n_branches % test["check_every"] == 0 or n_branches == len(
+                test["protocol"]):
+            error = HysteresisError(np.concatenate(disp),
+                                    np.concatenate(force),
+                                    np.concatenate(branch), test, n_branches)
+            if error > _worker_best.value:
+                break
+
+    complete = ok >= 0 and n_branches == len(test["protocol"])
+    if ok < 0:
+        error = np.inf
+    if complete:
+        with _worker_best.get_lock():
+            if error < _worker_best.value:
+                _worker_best.value = error
+    return {"round": round_index, "params": params, "error": error,
+            "ok": ok, "branches": n_branches, "complete": complete,
+            "seconds": time.perf_counter() - start}
+
+
+def _WriteLog(log_file, log, names):
+    with open(log_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["round"] + names + ["error", "ok", "branches",
+                                             "complete", "seconds"])
+        for entry in log:
+            writer.writerow([entry["round"]]
+                            + [entry["params"][name] for name in names]
+                            + [entry["error"], entry["ok"],
+                               entry["branches"], entry["complete"],
+                               entry["seconds"]])
+
+
+if __name__ == '__main__':
+    fit = Calibrate(log_file="calibration_log.csv")
+    print("best fit", fit.params, "error %.4f" % fit.error)
+    print("%i candidates, %i abandoned early"
+          % (len(fit.log), sum(not entry["complete"] for entry in fit.log)))
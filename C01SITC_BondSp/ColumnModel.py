@@ -0,0 +1,374 @@
+import os
+
+import numpy as np
+import openseespy.opensees as ops
+
+import FiberSection
+import SmartAnalyze
+from FiberSection import SCRIPT_DIVISIONS, RectSection
+from GroundMotion import LoadRecord
+from ResultCache import CachedResult, ResultKey
+
+# Conversion of the C01 model from N mm MPa to kip inch ksi
+INCH = 0.03937
+KSI = 145.0377 / 1000
+KIP = 0.2248 / 1000
+
+# SmartAnalyze control parameters that only direct logs and profiles, left
+# out of the cache key of RunColumn
+OUTPUT_CONTROLS = ('logLevel', 'printInterval', 'logFile', 'debugMode',
+                   'profile', 'profileFile', 'traceFile')
+
+# Beam-column formulations and integration rules of the column models
+ELEMENTS = ('dispBeamColumn', 'forceBeamColumn')
+INTEGRATIONS = ('Legendre', 'Lobatto', 'Radau', 'NewtonCotes')
+
+# Measured lateral history of the specimen: displacement (mm), force (kN)
+EXP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exp.txt')
+
+
+def ExpData():
+    """
+    The measured history of Mo and Wang (2000), test C3-1
+
+    :return: (disp, force) arrays, in mm and kN
+    """
+    values = LoadRecord(EXP_FILE).values
+    return values[:, 0], values[:, 1]
+
+
+def C01Column(factor=1.5, b=0.5, R=0.5, end_strain_sitc=None,
+              fiber_scale=1.0, fiber_size=None, element='dispBeamColumn',
+              n_elements=5, integration='Legendre', n_points=5):
+    """
+    Build the column of C01SITC_BondSp.py and apply its gravity load
+
+    The model is that of the script: a bond-slip zero-length section at the
+    base and five dispBeamColumn elements, in kip inch ksi.
+
+    :param factor: float, scale of the Bond_SP01 strengths and yield slip
+    :param b: float, stiffness reduction factor of Bond_SP01
+    :param R: float, pinching factor of Bond_SP01
+    :param end_strain_sitc: float, endStrainSITC of the confined
+        Concrete01WithSITC, None for the OpenSees default of the script
+    :param fiber_scale: float, scale of the fiber subdivisions of the
+        sections, 1.0 for the 10x10 core of the script
+    :param fiber_size: float, target fiber edge length (inch), overrides
+        fiber_scale, see FiberSection.RectSection
+    :param element: str, formulation of the beam-column elements, one of
+        ELEMENTS
+    :param n_elements: int, number of beam-column elements
+    :param integration: str, integration rule, one of INTEGRATIONS
+    :param n_points: int, integration points per element
+    :return: (node, dof) of the lateral displacement control
+    """
+    _CheckElements(element, integration)
+    fc = 26.38 * KSI
+    fyl = 497 * KSI
+    ful = 592 * KSI
+    Elong = 200e3 * KSI
+    height = 1400 * INCH
+    width = 400 * INCH
+    cover = 34 * INCH
+    dlongi = 19.05 * INCH
+    axial = -450e3 * KIP
+
+    ops.wipe()
+    ops.model('basic', '-ndm', 2, '-ndf', 3)
+
+    ops.uniaxialMaterial('Concrete01', 1, -fc, -0.002, 0, -0.006)
+    sitc = [] if end_strain_sitc is None else [end_strain_sitc]
+    ops.uniaxialMaterial('Concrete01WithSITC', 2, -1.15 * fc, -0.005,
+                         -0.8 * 1.15 * fc, -0.01, *sitc)
+    ops.uniaxialMaterial('Steel02', 3, fyl, Elong, 0.015, 20, 0.925, 0.15)
+    Sy = (0.1 * (dlongi / 4000 * (fyl * 1000) / ((fc * 1000) ** 0.5)
+                 * (2 * 0.4 + 1)) ** (1 / 0.4) + 0.013) * factor
+    ops.uniaxialMaterial('Bond_SP01', 4, fyl * factor, Sy, ful * factor,
+                         35 * Sy, b, R)
+    ops.uniaxialMaterial('Elastic', 5, 1e10)
+    ops.uniaxialMaterial('Concrete01', 6, -1.15 * fc, -0.005,
+                         -0.8 * 1.15 * fc, -0.015)
+
+    divisions = _ScaledDivisions(fiber_scale)
+    RectSection(1, width, width, cover, 2, 1, 3, dlongi,
+                fiber_size=fiber_size, divisions=divisions)
+    RectSection(2, width, width, cover, 6, 1, 4, dlongi,
+                fiber_size=fiber_size, divisions=divisions)
+    ops.section('Aggregator', 3, 5, 'Vy', '-section', 2)
+
+    # Node 2 coincides with the base node 1, across the bond-slip section
+    ops.node(1, 0, 0)
+    for i in range(n_elements + 1):
+        ops.node(i + 2, 0, i * height / n_elements)
+    ops.geomTransf('PDelta', 1)
+    ops.beamIntegration(integration, 1, 1, n_points)
+    ops.element('zeroLengthSection', 1, 1, 2, 3)
+    for i in range(n_elements):
+        ops.element(element, i + 2, i + 2, i + 3, 1, 1)
+    ops.fix(1, 1, 1, 1)
+
+    top = n_elements + 2
+    _Gravity(top, axial, 1e-3)
+    return top, 1
+
+
+def ConcreteCMColumn(fiber_scale=1.0, fiber_size=None,
+                     element='forceBeamColumn', n_elements=1,
+                     integration='Legendre', n_points=5):
+    """
+    Build the column of test_concreteCM_unsolved.py and apply its gravity
+    load
+
+    The model is that of the script: one forceBeamColumn with ConcreteCM
+    fibers, in N mm MPa.
+
+    :param fiber_scale: float, scale of the fiber subdivisions of the
+        section, 1.0 for the 10x10 core of the script
+    :param fiber_size: float, target fiber edge length (mm), overrides
+        fiber_scale, see FiberSection.RectSection
+    :param element: str, formulation of the beam-column elements, one of
+        ELEMENTS
+    :param n_elements: int, number of beam-column elements
+    :param integration: str, integration rule, one of INTEGRATIONS
+    :param n_points: int, integration points per element
+    :return: (node, dof) of the lateral displacement control
+    """
+    _CheckElements(element, integration)
+    fc = 26.38
+    fyl = 497
+    height = 1400
+    width = 400
+    cover = 34
+    dlongi = 19.05
+    axial = -450e3
+
+    ops.wipe()
+    ops.model('basic', '-ndm', 2, '-ndf', 3)
+
+    ops.uniaxialMaterial('ConcreteCM', 1, -32.0, -1673.6e-6, 3.44e4, 4.2538,
+                         2.3, 2.80, 113.6e-6, 4.2538, 2, '-GapClose', 1)
+    ops.uniaxialMaterial('ConcreteCM', 2, -1.15 * fc, -2230.3e-6, 3.44e4,
+                         1.9165, 30, 2.80, 113.6e-6, 4.2538, 10000,
+                         '-GapClose', 1)
+    ops.uniaxialMaterial('Steel02', 3, fyl, 200e3, 0.01, 20, 0.925, 0.15)
+
+    divisions = _ScaledDivisions(fiber_scale)
+    RectSection(1, width, width, cover, 2, 1, 3, dlongi,
+                fiber_size=fiber_size, divisions=divisions)
+
+    for i in range(n_elements + 1):
+        ops.node(i + 1, 0, i * height / n_elements)
+    ops.geomTransf('Linear', 1)
+    ops.beamIntegration(integration, 1, 1, n_points)
+    for i in range(n_elements):
+        ops.element(element, i + 1, i + 1, i + 2, 1, 1)
+    ops.fix(1, 1, 1, 1)
+
+    top = n_elements + 1
+    _Gravity(top, axial, 1e-8)
+    return top, 1
+
+
+# Column models by name, see RunColumn
+MODELS = {'c01': C01Column, 'concrete_cm': ConcreteCMColumn}
+
+
+def Pushover(node, dof, protocol, max_step=0.1, control=None, history=True):
+    """
+    Run a lateral displacement protocol on a column built by this module
+
+    A unit reference load is applied at the control node, so the load
+    factor is the lateral force.
+
+    :param node: int, control node
+    :param dof: int, control dof
+    :param protocol: list, target displacements
+    :param max_step: float, maximum displacement increment
+    :param control: dict, further SmartAnalyzeStatic control parameters
+    :param history: bool, sample the response at every converged piece;
+        False skips the probes, so blocks of blockSteps run as single
+        analyze calls
+    :return: (ok, results), results holds the 'disp' and 'force' arrays
+        sampled at every converged piece, only the last state without
+        history
+    """
+    _LateralLoad(node, dof)
+    user_control = {'logLevel': 'silent'}
+    user_control.update(control or {})
+    protocol = np.asarray(protocol, dtype=float)
+    if history:
+        user_control['probes'] = {'disp': ('nodeDisp', node, dof),
+                                  'force': ('getTime',)}
+        return SmartAnalyze.SmartAnalyzeStatic(node, dof, max_step, protocol,
+                                               user_control)
+    user_control['probes'] = None
+    ok = SmartAnalyze.SmartAnalyzeStatic(node, dof, max_step, protocol,
+                                         user_control)
+    return ok, {'disp': np.array([ops.nodeDisp(node, dof)]),
+                'force': np.array([ops.getTime()])}
+
+
+def RunColumn(model, protocol, params=None, max_step=0.1, control=None,
+              cache=False):
+    """
+    Build a column of MODELS and run a protocol on it, see Pushover
+
+    :param model: str, name of the column in MODELS
+    :param protocol: list, target displacements
+    :param params: dict, keyword arguments of the model function
+    :param max_step: float, maximum displacement increment
+    :param control: dict, further SmartAnalyzeStatic control parameters;
+        side outputs such as a profile dict are not filled on a cache hit
+    :param cache: True to serve repeated runs from the result cache, keyed
+        by the arguments (control without OUTPUT_CONTROLS), this module,
+        SmartAnalyze, FiberSection and the OpenSeesPy version; "refresh" to
+        run again and replace the cached outputs, see ResultCache
+    :return: (ok, results), as Pushover
+    """
+    params = params or {}
+    protocol = np.asarray(protocol, dtype=float)
+
+    def Run():
+        node, dof = MODELS[model](**params)
+        ok, results = Pushover(node, dof, protocol, max_step, control)
+        results['ok'] = np.array(ok)
+        return results
+
+    if cache:
+        analysis_control = {name: value for name, value in
+                            (control or {}).items()
+                            if name not in OUTPUT_CONTROLS}
+        key = ResultKey({'model': model, 'params': params,
+                         'max_step': max_step, 'control': analysis_control},
+                        [protocol], [__file__, SmartAnalyze.__file__,
+                                     FiberSection.__file__])
+        results = CachedResult(key, Run, cache)
+    else:
+        results = Run()
+    return int(results.pop('ok')), results
+
+
+def Branches(node, dof, protocol, max_step=0.1, control=None):
+    """
+    Run a lateral displacement protocol one target at a time
+
+    The response is that of Pushover, but the caller sees every branch as
+    soon as it is done and can stop the analysis by leaving the loop.
+
+    :param node: int, control node
+    :param dof: int, control dof
+    :param protocol: list, target displacements
+    :param max_step: float, maximum displacement increment
+    :param control: dict, further SmartAnalyzeStatic control parameters
+    :return: generator of (ok, results) of each target, as Pushover; a
+        target too close to the previous one gives empty results, the
+        generator stops after a failed branch
+    """
+    _LateralLoad(node, dof)
+    user_control = {'logLevel': 'silent'}
+    user_control.update(control or {})
+    user_control['probes'] = {'disp': ('nodeDisp', node, dof),
+                              'force': ('getTime',)}
+    min_step = user_control.get('minStep', 1.0e-6)
+
+    # The drivers measure targets from zero, each branch is given as the
+    # move from the previous target
+    position = 0.0
+    for target in np.asarray(protocol, dtype=float).tolist():
+        if abs(target - position) < min_step:
+            yield 0, {'disp': np.zeros(0), 'force': np.zeros(0)}
+            continue
+        ok, results = SmartAnalyze.SmartAnalyzeStatic(
+            node, dof, max_step, [target - position], user_control)
+        yield ok, results
+        if ok < 0:
+            return
+        position = target
+
+
+def _LateralLoad(node, dof):
+    # Unit reference load, the load factor is the lateral force
+    ops.timeSeries('Linear', 2)
+    ops.pattern('Plain', 2, 2)
+    load = [0.0] * 3
+    load[dof - 1] = 1.0
+    ops.load(node, *load)
+    ops.constraints('Plain')
+    ops.numberer('Plain')
+    ops.system('BandGen')
+
+
+def DefaultProtocol(model):
+    """
+    The protocol of a column in MODELS as its script runs it
+
+    :param model: str, name of the column in MODELS
+    :return: array, target displacements: the reversal points of exp.txt
+        for "c01", the cycles of test_concreteCM_unsolved.py for
+        "concrete_cm"
+    """
+    if model == 'c01':
+        disp, force = ExpData()
+        return SmartAnalyze.ReversalPoints(disp * INCH)[0]
+    return np.array([100.0, -100.0, 100.0, -100.0, 0.0])
+
+
+def ForceError(disp, force, reference_disp, reference_force):
+    """
+    Force difference of two runs of the same displacement protocol
+
+    The runs may split the protocol into different pieces, so their probe
+    samples are compared on a common axis, the displacement travelled
+    since the start, as in Calibration.HysteresisError: the force of the
+    run is interpolated at the samples of the reference run, from the
+    unloaded start of the protocol.
+
+    :param disp: array, displacements of a run, see Pushover
+    :param force: array, forces of the run
+    :param reference_disp: array, displacements of the reference run
+    :param reference_force: array, forces of the reference run
+    :return: float, root mean square force difference relative to the peak
+        reference force, inf if the run stops short of the reference
+    """
+    travel = _Travel(disp)
+    reference_travel = _Travel(reference_disp)
+    if not len(travel) or travel[-1] < reference_travel[-1] * (1 - 1e-9):
+        return np.inf
+    difference = np.interp(reference_travel, np.append(0.0, travel),
+                           np.append(0.0, force)) - reference_force
+    return float(np.sqrt(np.mean(difference ** 2))
+                 / np.abs(reference_force).max())
+
+
+def _CheckElements(element, integration):
+    if element not in ELEMENTS:
+        raise ValueError("unknown element: %s" % element)
+    if integration not in INTEGRATIONS:
+        raise ValueError("unknown integration: %s" % integration)
+
+
+def _ScaledDivisions(fiber_scale):
+    # Subdivisions of the scripts scaled, one fiber through the cover
+    return tuple(max(1, int(round(n * fiber_scale)))
+                 for n in SCRIPT_DIVISIONS[:-1]) + SCRIPT_DIVISIONS[-1:]
+
+
+def _Travel(disp):
+    # Displacement travelled from zero to every sample
+    disp = np.asarray(disp, dtype=float)
+    return np.cumsum(np.abs(np.diff(disp, prepend=0.0)))
+
+
+def _Gravity(node, axial, tol):
+    ops.timeSeries('Linear', 1)
+    ops.pattern('Plain', 1, 1)
+    ops.load(node, 0, axial, 0)
+    ops.constraints('Plain')
+    ops.numberer('Plain')
+    ops.system('BandGen')
+    ops.test('NormUnbalance', tol, 100)
+    ops.algorithm('Newton')
+    ops.integrator('LoadControl', 0.1)
+    ops.analysis('Static')
+    ops.analyze(10)
+    ops.loadConst('-time', 0)
@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+import openseespy.opensees as ops
+
+# Subdivisions of the hand-written sections of the scripts: 10x10 core,
+# 10x1 cover strips along y and 1x8 cover strips along z
+SCRIPT_DIVISIONS = (10, 10, 10, 8, 1)
+
+
+def RectSection(sec_tag, width, depth, cover, core_mat, cover_mat, bar_mat,
+                bar_diameter, bars_y=4, bars_z=4, fiber_size=None,
+                divisions=SCRIPT_DIVISIONS, gj=None):
+    """
+    Define a rectangular reinforced concrete fiber section
+
+    The section is a confined core, two cover strips along y spanning the
+    full width, two cover strips along z between them, and perimeter bars
+    one cover and half a bar diameter in from the faces. The patches and
+    layers are those of the scripts, so the default divisions give their
+    fibers in their order.
+
+    :param sec_tag: int, section tag
+    :param width: float, dimension along the local y axis
+    :param depth: float, dimension along the local z axis
+    :param cover: float, cover thickness to the outside of the bars
+    :param core_mat: int, material tag of the core concrete
+    :param cover_mat: int, material tag of the cover concrete
+    :param bar_mat: int, material tag of the bars
+    :param bar_diameter: float, diameter of the bars
+    :param bars_y: int, bars along each face parallel to y, with corners
+    :param bars_z: int, bars along each face parallel to z, with corners
+    :param fiber_size: float, target edge length of the concrete fibers;
+        the subdivisions are chosen so that no fiber edge is longer
+    :param divisions: tuple, (core along y, core along z, cover along y,
+        cover along z, cover through the thickness) subdivisions, used when
+        fiber_size is None
+    :param gj: float, torsional stiffness, for 3D models
+    :return: int, number of fibers
+    """
+    half_y = width / 2
+    half_z = depth / 2
+    inner_y = half_y - cover
+    inner_z = half_z - cover
+    if fiber_size is not None:
+        divisions = (_Count(2 * inner_y, fiber_size),
+                     _Count(2 * inner_z, fiber_size),
+                     _Count(width, fiber_size),
+                     _Count(2 * inner_z, fiber_size),
+                     _Count(cover, fiber_size))
+    core_y, core_z, cover_y, cover_z, through = divisions
+
+    if gj is None:
+        ops.section('Fiber', sec_tag)
+    else:
+        ops.section('Fiber', sec_tag, '-GJ', gj)
+    ops.patch('rect', core_mat, core_y, core_z, inner_y, inner_z, -inner_y,
+              -inner_z)
+    ops.patch('rect', cover_mat, cover_y, through, half_y, half_z, -half_y,
+              inner_z)
+    ops.patch('rect', cover_mat, cover_y, through, half_y, -inner_z, -half_y,
+              -half_z)
+    ops.patch('rect', cover_mat, through, cover_z, -inner_y, inner_z,
+              -half_y, -inner_z)
+    ops.patch('rect', cover_mat, through, cover_z, half_y, inner_z, inner_y,
+              -inner_z)
+
+    # Rows of bars: the two faces parallel to y, then the pairs of bars on
+    # the faces parallel to z between them
+    area = 0.25 * np.pi * bar_diameter ** 2
+    edge_y = inner_y - bar_diameter / 2
+    edge_z = inner_z - bar_diameter / 2
+    ops.layer('straight', bar_mat, bars_y, area, -edge_y, edge_z, edge_y,
+              edge_z)
+    ops.layer('straight', bar_mat, bars_y, area, -edge_y, -edge_z, edge_y,
+              -edge_z)
+    for z in np.linspace(edge_z, -edge_z, bars_z)[1:-1].tolist():
+        ops.layer('straight', bar_mat, 2, area, -edge_y, z, edge_y, z)
+
+    return (core_y * core_z + 2 * cover_y * through + 2 * through * cover_z
+            + 2 * bars_y + 2 * (bars_z - 2))
+
+
+def _Count(length, fiber_size):
+    return max(1, math.ceil(length / fiber_size - 1e-9))
@@ -0,0 +1,148 @@
+import csv
+import itertools
+import multiprocessing
+import time
+
+import numpy as np
+
+import ColumnModel
+
+# Columns of the table written by WriteTable
+TABLE_COLUMNS = ("element", "n_elements", "integration", "n_points", "ok",
+                 "seconds", "error", "pareto")
+
+# Model and protocol of the current worker process, set once by _InitWorker
+_worker_model = None
+_worker_protocol = None
+_worker_max_step = None
+_worker_params = None
+
+
+def FidelityGrid(element=ColumnModel.ELEMENTS, n_elements=(1, 2, 3, 5, 8),
+                 integration=("Legendre", "Lobatto"), n_points=(3, 4, 5, 7)):
+    """
+    Build the cases of a fidelity sweep as the cartesian product of the axes
+
+    Every argument is either a single value or a list of values. The cases
+    are ordered like nested loops with `element` outermost.
+
+    :param element: beam-column formulations, see ColumnModel.ELEMENTS
+    :param n_elements: numbers of beam-column elements
+    :param integration: integration rules, see ColumnModel.INTEGRATIONS
+    :param n_points: integration points per element
+    :return: list of dict, one per case
+    """
+    names = ("element", "n_elements", "integration", "n_points")
+    axes = [np.atleast_1d(v).tolist()
+            for v in (element, n_elements, integration, n_points)]
+    return [dict(zip(names, values)) for values in itertools.product(*axes)]
+
+
+def RunFidelity(cases, model="c01", protocol=None, reference=None,
+                params=None, max_step=0.1, workers=None):
+    """
+    Run the same protocol on every model fidelity across a pool of workers
+
+    Each worker process owns its own OpenSees instance and runs one case at
+    a time, so the run times of concurrent cases are comparable as long as
+    there are no more workers than physical cores.
+
+    :param cases: list of dict, e.g. from FidelityGrid
+    :param model: str, name of the column in ColumnModel.MODELS
+    :param protocol: list, target displacements, defaults to
+        ColumnModel.DefaultProtocol
+    :param reference: dict, the case the accuracy is measured against,
+        defaults to the case with the most integration points in total
+    :param params: dict, further keyword arguments of the model function
+    :param max_step: float, maximum displacement increment
+    :param workers: int, number of worker processes, defaults to the CPUs
+    :return: list of dict, one row per case sorted by run time, with ok,
+        seconds, error (see ColumnModel.ForceError, inf if the case or the
+        reference failed) and pareto, see ParetoFront
+    """
+    cases = [dict(case) for case in cases]
+    if reference is None:
+        reference = max(cases, key=lambda case: case["n_elements"]
+                        * case["n_points"])
+    if protocol is None:
+        protocol = ColumnModel.DefaultProtocol(model)
+    runs = cases if reference in cases else cases + [dict(reference)]
+
+    pool = multiprocessing.Pool(workers, _InitWorker,
+                                (model, protocol, max_step, params or {}))
+    try:
+        results = pool.map(_RunCase, runs)
+    finally:
+        pool.terminate()
+        pool.join()
+
+    ok, reference_results, seconds = results[runs.index(reference)]
+    if ok != 0:
+        reference_results = None
+    rows = []
+    for case, (ok, run_results, seconds) in zip(cases, results):
+        if ok == 0 and reference_results is not None:
+            error = ColumnModel.ForceError(
+                run_results["disp"], run_results["force"],
+                reference_results["disp"], reference_results["force"])
+        else:
+            error = np.inf
+        rows.append(dict(case, ok=ok, seconds=seconds, error=error))
+    return ParetoFront(rows)
+
+
+def ParetoFront(rows):
+    """
+    Mark the rows no other row beats in both run time and accuracy
+
+    :param rows: list of dict with seconds and error
+    :return: list, the rows sorted by run time, each with pareto set
+    """
+    rows = sorted(rows, key=lambda row: (row["seconds"], row["error"]))
+    best_error = np.inf
+    for row in rows:
+        row["pareto"] = bool(row["error"] < best_error)
+        best_error = min(best_error, row["error"])
+    return rows
+
+
+def WriteTable(filename, rows):
+    """
+    Write the rows of RunFidelity as a CSV table
+
+    :param filename: str, path of the CSV file
+    :param rows: list of dict, see RunFidelity
+    :return: str, filename
+    """
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, TABLE_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    return filename
+
+
+def _InitWorker(model, protocol, max_step, params):
+    global _worker_model, _worker_protocol, _worker_max_step, _worker_params
+    _worker_model = model
+    _worker_protocol = protocol
+    _worker_max_step = max_step
+    _worker_params = params
+
+
+def _RunCase(case):
+    start = time.perf_counter()
+    ok, results = ColumnModel.RunColumn(_worker_model, _worker_protocol,
+                                        dict(_worker_params, **case),
+                                        _worker_max_step)
+    return ok, results, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    rows = RunFidelity(FidelityGrid())
+    print("%-16s %3s %-12s %3s %3s %8s %8s" % ("element", "n", "integration",
+                                             "np", "ok", "seconds", "error"))
+    for row in rows:
+        print("%-16s %3i %-12s %3i %3i %8.2f %8.4f%s"
+              % (row["element"], row["n_elements"], row["integration"],
+                 row["n_points"], row["ok"], row["seconds"], row["error"],
+                 "  *" if row["pareto"] else ""))
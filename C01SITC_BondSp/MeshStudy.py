@@ -0,0 +1,95 @@
+import collections
+import time
+
+import numpy as np
+
+import ColumnModel
+
+# Fiber edge lengths of the study, finest first, in the units of each model;
+# None is the hand-written mesh of the scripts (10x10 core), placed by its
+# longest fiber edge
+FIBER_SIZES = {
+    "c01": [0.5, 0.75, 1.0, 1.5, None, 2.0, 3.0, 4.5],                 # inch
+    "concrete_cm": [12.5, 20.0, 25.0, 40.0, None, 50.0, 75.0, 110.0],  # mm
+}
+
+# Result of MeshConvergence: one row per mesh run, and the coarsest row
+# whose response stays within the tolerance, None if there is none
+Convergence = collections.namedtuple("Convergence", ["rows", "best"])
+
+
+def MeshConvergence(model="c01", fiber_sizes=None, protocol=None,
+                    tolerance=0.02, params=None, max_step=0.1,
+                    stop_early=False):
+    """
+    Find the cheapest fiber mesh of a column whose response matches the
+    finest mesh
+
+    The protocol is run on the finest mesh first and then on progressively
+    coarser ones, and the forces are compared with ColumnModel.ForceError.
+    The error does not fall steadily with the fiber size, e.g. a coarser
+    mesh may happen to match the finest one better, so by default every
+    mesh is run.
+
+    :param model: str, name of the column in ColumnModel.MODELS
+    :param fiber_sizes: list, fiber edge lengths, finest first, None for
+        the mesh of the scripts; the first is the reference, defaults to
+        FIBER_SIZES
+    :param protocol: list, target displacements, defaults to
+        ColumnModel.DefaultProtocol
+    :param tolerance: float, largest root mean square force difference
+        from the finest mesh relative to its peak force
+    :param params: dict, further keyword arguments of the model function
+    :param max_step: float, maximum displacement increment
+    :param stop_early: bool, stop at the first mesh beyond the tolerance,
+        which saves the coarser runs but may miss a coarser mesh within
+        it
+    :return: Convergence; every row holds fiber_size, ok, seconds, steps
+        per second, error and within
+    """
+    sizes = list(fiber_sizes or FIBER_SIZES[model])
+    if protocol is None:
+        protocol = ColumnModel.DefaultProtocol(model)
+
+    rows = []
+    reference = None
+    for fiber_size in sizes:
+        run_params = dict(params or {}, fiber_size=fiber_size)
+        start = time.perf_counter()
+        ok, results = ColumnModel.RunColumn(model, protocol, run_params,
+                                            max_step)
+        seconds = time.perf_counter() - start
+        if reference is None:
+            if ok < 0:
+                raise RuntimeError("MeshConvergence: the finest mesh, fiber "
+                                   "size %s, failed" % fiber_size)
+            reference = results
+        error = ColumnModel.ForceError(
+            results["disp"], results["force"], reference["disp"],
+            reference["force"]) if ok == 0 else np.inf
+        rows.append({"fiber_size": fiber_size, "ok": ok, "seconds": seconds,
+                     "steps_per_second": len(results["force"]) / seconds,
+                     "error": error, "within": error <= tolerance})
+        if stop_early and not rows[-1]["within"]:
+            break
+
+    within = [row for row in rows if row["within"]]
+    best = min(within, key=lambda row: row["seconds"]) if within else None
+    return Convergence(rows, best)
+
+
+def _Name(fiber_size):
+    return "script" if fiber_size is None else "%g" % fiber_size
+
+
+if __name__ == '__main__':
+    study = MeshConvergence()
+    for row in study.rows:
+        print("fiber size %6s  ok %2i  %7.2f s  error %.4f%s"
+              % (_Name(row["fiber_size"]), row["ok"], row["seconds"],
+                 row["error"], "" if row["within"] else "  beyond tolerance"))
+    if study.best is not None:
+        print("cheapest mesh within tolerance: fiber size %s"
+              % _Name(study.best["fiber_size"]))
+    else:
+        print("no mesh within tolerance")
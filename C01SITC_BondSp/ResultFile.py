@@ -0,0 +1,178 @@
+import collections
+import json
+import os
+import struct
+
+import numpy as np
+
+# A result file opened by LoadResults: columns maps each name to a read-only
+# memory-mapped array of n_rows rows (2D for multi-column entries); units,
+# ids and attrs are the metadata stored with them
+Results = collections.namedtuple("Results",
+                                 ["columns", "n_rows", "units", "ids", "attrs"])
+
+# Suffix of the binary file written by ConvertText next to the text file
+RESULT_SUFFIX = ".bin"
+
+# File layout: magic, format version and header length, then the JSON header,
+# then one block per entry, each holding its columns one after the other
+MAGIC = b"OSRESULT"
+VERSION = 1
+_prefix = struct.Struct("<8sII")
+# Blocks start on multiples of this many bytes
+ALIGN = 64
+
+
+def WriteResults(filename, columns, units=None, ids=None, attrs=None,
+                 dtype=None):
+    """
+    Write result columns to a binary columnar file
+
+    Every column is stored contiguously, so reading one column, or a range
+    of rows of it, touches only its own pages. The probe results returned
+    by SmartAnalyze can be written as they are.
+
+    :param filename: str, path of the result file
+    :param columns: dict of name: array, 1D or 2D (one column per entry of
+        the second axis), all with the same number of rows
+    :param units: dict of name: str, unit of each entry
+    :param ids: dict of name: node or element tag(s) of each entry
+    :param attrs: dict, further metadata, must be JSON serializable
+    :param dtype: numpy dtype the columns are stored as, e.g. float32 for
+        recorder text with 6 significant digits; defaults to the column's
+    :return: str, filename
+    """
+    units = units or {}
+    ids = ids or {}
+    arrays = [(name, np.asarray(values, dtype))
+              for name, values in columns.items()]
+    n_rows = len(arrays[0][1]) if arrays else 0
+
+    entries = []
+    blocks = []
+    offset = 0
+    for name, values in arrays:
+        if values.ndim not in (1, 2) or len(values) != n_rows:
+            raise ValueError("column %s must be 1D or 2D with %i rows"
+                             % (name, n_rows))
+        if values.dtype.kind not in "biuf":
+            raise ValueError("column %s must be numeric" % name)
+        # Columns of an entry one after the other
+        block = np.ascontiguousarray(values.T, values.dtype.newbyteorder("<"))
+        entries.append({"name": name, "dtype": block.dtype.str,
+                        "width": values.shape[1] if values.ndim == 2 else None,
+                        "offset": offset, "unit": units.get(name),
+                        "ids": _JsonIds(ids.get(name))})
+        blocks.append(block)
+        offset += _Aligned(block.nbytes)
+
+    header = json.dumps({"n_rows": n_rows, "entries": entries,
+                         "attrs": attrs or {}}).encode()
+    data_start = _Aligned(_prefix.size + len(header))
+
+    tmp_path = "%s.%d.tmp" % (filename, os.getpid())
+    with open(tmp_path, "wb") as f:
+        f.write(_prefix.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for entry, block in zip(entries, blocks):
+            f.seek(data_start + entry["offset"])
+            f.write(block.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, filename)
+    return filename
+
+
+def LoadResults(filename):
+    """
+    Open a result file written by WriteResults as memory maps
+
+    Nothing but the header is read; slicing a column reads only the pages
+    of the requested rows.
+
+    :param filename: str, path of the result file
+    :return: Results
+    """
+    header, header_size = _ReadHeader(filename)
+    n_rows = header["n_rows"]
+    data_start = _Aligned(_prefix.size + header_size)
+    raw = np.memmap(filename, np.uint8, "r")
+    columns = {}
+    for entry in header["entries"]:
+        dtype = np.dtype(entry["dtype"])
+        width = entry["width"]
+        start = data_start + entry["offset"]
+        size = n_rows * (width or 1) * dtype.itemsize
+        values = raw[start:start + size].view(dtype)
+        if width is not None:
+            values = values.reshape(width, n_rows).T
+        columns[entry["name"]] = values
+    units = {entry["name"]: entry["unit"] for entry in header["entries"]}
+    ids = {entry["name"]: entry["ids"] for entry in header["entries"]}
+    return Results(columns, n_rows, units, ids, header["attrs"])
+
+
+def ConvertText(text_file, result_file=None, names=None, units=None,
+                ids=None, dtype=None):
+    """
+    Convert a text output, e.g. of an OpenSees recorder, to a result file
+
+    The text file is converted again only when it is newer than the result
+    file or was converted with other names, units, ids or dtype, so
+    LoadResults(ConvertText(text_file)) parses it once.
+
+    :param text_file: str, path of the whitespace separated text file
+    :param result_file: str, path of the result file, defaults to the text
+        file with RESULT_SUFFIX
+    :param names: list, one name per text column, defaults to col0, col1...
+    :param units: dict of name: str, unit of each column
+    :param ids: dict of name: node or element tag of each column
+    :param dtype: numpy dtype the columns are stored as, see WriteResults
+    :return: str, path of the result file
+    """
+    if result_file is None:
+        result_file = os.path.splitext(text_file)[0] + RESULT_SUFFIX
+    # The arguments of the conversion, stored in the attrs of the result
+    conversion = json.loads(json.dumps(
+        {"names": names, "units": units, "ids": ids,
+         "dtype": None if dtype is None else np.dtype(dtype).str},
+        default=_JsonIds))
+    if (os.path.exists(result_file) and os.stat(result_file).st_mtime_ns
+            >= os.stat(text_file).st_mtime_ns):
+        try:
+            attrs = _ReadHeader(result_file)[0]["attrs"]
+        except (OSError, ValueError, struct.error):
+            attrs = {}
+        if attrs.get("conversion") == conversion:
+            return result_file
+
+    values = np.loadtxt(text_file, ndmin=2)
+    if names is None:
+        names = ["col%i" % i for i in range(values.shape[1])]
+    if len(names) != values.shape[1]:
+        raise ValueError("%s has %i columns, %i names given"
+                         % (text_file, values.shape[1], len(names)))
+    columns = {name: values[:, i] for i, name in enumerate(names)}
+    return WriteResults(result_file, columns, units, ids,
+                        {"source": os.path.basename(text_file),
+                         "conversion": conversion}, dtype)
+
+
+def _ReadHeader(filename):
+    with open(filename, "rb") as f:
+        magic, version, header_size = _prefix.unpack(f.read(_prefix.size))
+        if magic != MAGIC:
+            raise ValueError("%s is not a result file" % filename)
+        if version > VERSION:
+            raise ValueError("%s has format version %i, this reader knows %i"
+                             % (filename, version, VERSION))
+        return json.loads(f.read(header_size).decode()), header_size
+
+
+def _Aligned(size):
+    return -(-size // ALIGN) * ALIGN
+
+
+def _JsonIds(tags):
+    if tags is None:
+        return None
+    return np.asarray(tags).tolist()
@@ -47,131 +47,127 @@ README:
         protocol=[1, -1, 1, -1, 0]
         SmartAnalyzeStatic(node, dof, maxStep, protocol)
     
-    Example 3: change control parameters
-        control['printPer']=20
+    Example 3: measured loading protocol, analyze between the reversal points only
+        protocol, indices=ReversalPoints(measured, tol=0.01)
+        SmartAnalyzeStatic(node, dof, maxStep, protocol)
+        (measured[indices] are the samples to compare the results at the reversal points with)
+    
+    Example 4: change control parameters
+        control['logLevel']='summary'
         control['tryAlterAlgoTypes']=True
         control['algoTypes']=[20, 30]
         SmartAnalyzeTransient(dt, npts, control)
         
-    Example 4: define user algorithm
+    Example 5: define user algorithm
         def UserAlgorithm0():
-            algorithm('KrylovNewton', increment='initial', maxDim=10)
-        control['algoTypes']=[80]
+            algorithm('KrylovNewton', '-increment', 'initial', '-maxDim', 10)
+        SmartAnalyze.RegisterAlgorithm(90, UserAlgorithm0)
+        control['algoTypes']=[90]
         SmartAnalyzeTransient(dt, npts, control)
     
-    The work flow
+    Reference
     ---------------------------------------------------------------------------
-        1. Start
-        2. Set initial step length, algorithm method and test (You don't need to specify them in your model.)
-        3. Divide the whole analysis into pieces. For Static, use maxStep. For Transient, use dt.
-        4. Loop by each piece and analyze recursively with RecursiveAnalyze, in the following way
-            4.1 Trail analyze for one step, if converge, continue loop 4.
-            4.2 If not converge, if tryAddTestTimes is True, if the last test norm is smaller than normTol, recursively set a larger test time.
-            4.3 If not converge, if tryAlterAlgoTypes is True, recursively loop to the next algo type.
-            4.4 If not converge, divide the current step into two steps. The first one equals to the current step times relaxation.
-            4.5 If either step is smaller than minStep:
-                4.5.1 If tryLooseTestTol is True, loose test tolerance to looseTestTolTo.
-                4.5.2 Else, return not converge code. Exit.
-            4.6 If both steps are not smaller than minStep, divide the current piece into two and re-run loop 4.
-        5. If converge, return success message.
-    
-    Control Parameters
-    ---------------------------------------------------------------------------
-    TEST RELATED:
-        `testType`        : string. Identical to the testType in OpenSees test command. Default is "EnergyIncr".
-                            Choices see http://opensees.berkeley.edu/wiki/index.php/Test_Command.
-        `testTol`         : float. The initial test tolerance set to the OpenSees test command. Default is 1.0e-6.
-                            If tryLooseTestTol is set to True, the test tolerance can be loosen.
-        `testIterTimes`   : integer. The initial number of test iteration times. Default is 7.
-                            If tryAddTestTimes is set to True, the number of test times can be enlarged.
-        `testPrintFlag`   : integer. The test print flag in OpenSees Test command. Default is 0.
-                            Choices see http://opensees.berkeley.edu/wiki/index.php/Test_Command.
-        `tryAddTestTimes` : boolean. Default is True If this is set to True, 
-                            the number of test times will be enlarged if the last test norm is smaller than `normTol`,
-                            the enlarged number is specified in `testIterTimesMore`.
-                            Otherwise, the number of test times will always be equal to `testIterTimes`.
-        `normTol`         : float. Only useful when tryAddTestTimes is True. Default is 1.0e3.
-                            If unconverge, the last norm of test will be compared to `normTol`.
-                            If the norm is smaller, the number of test times will be enlarged.
-        `testIterTimesMore` : integer. Only useful when tryaddTestTimes is True. Default is 50.
-                            If unconverge and norm is ok, the test iteration times will be set to this number.
-        `tryLooseTestTol` : boolean. If this is set to True, if unconverge at minimum step,
-                            the test tolerance will be loosen to the number specified by `looseTestTolTo`.
-                            the step will be set back.
-                            Default is True.
-        `looseTestTolTo`  : float. Only useful if tryLooseTestTol is True.
-                            If unconvergance at the min step, the test tolerance will be set to this value.
-                            Default is 1.0
-    
-    ALGORITHM RELATED:
-        `tryAlterAlgoTypes` : boolean. Default is False.
-                              If True, different algorithm types specified in `algoTypes` will be tried during unconvergance.
-                              If False, the first algorithm type specified in `algoTypes` will be used.
-        `algoTypes`         : list of integer. A list of flags of the algorithms to be used during unconvergance.
-                              The integer flag is documented in the following section.
-                              Only useful when tryAlterAlgoTypes is True.
-                              The first flag will be used by default.
-                              The algorithm command in the model will be ignored.
-                              Default is { 40 }
-                              If you need other algorithm, try a user-defined algorithm. See the following section.
-        
-    STEP RELATED:
-        `initialStep`     : float. Default is equal to $dt.
-                            Specifying the initial Step length to conduct analysis.
-        `relaxation`      : float, between 0 and 1. Default is 0.5.
-                            A factor that is multiplied by each time the step length is shortened.
-        `minStep`         : float. Default is 1.0e-6.
-                            The step tolerance when shortening the step length.
-                            If step length is smaller than minStep, special ways to converge the model will be used according to `try-` flags.
-    
-    LOGGING RELATED:
-        `printPer`        : integer. Print to the console every several trials. Default is 10.
-        `debugMode`       : boolean. Print as much information as possible.
-    
-    Algorithm type flag reference
-    ---------------------------------------------------------------------------
-     0:  Linear
-     1:  Linear -initial
-     2:  Linear -factorOnce
-    10:  Newton
-    11:  Newton -initial
-    12:  Newton -initialThenCurrent
-    20:  NewtonLineSearch
-    21:  NewtonLineSearch -type Bisection
-    22:  NewtonLineSearch -type Secant
-    23:  NewtonLineSearch -type RegulaFalsi
-    30:  ModifiedNewton
-    31:  ModifiedNewton -initial
-    40:  KrylovNewton
-    41:  KrylovNewton -iterate initial
-    42:  KrylovNewton -increment initial
-    43:  KrylovNewton -iterate initial -increment initial
-    44:  KrylovNewton -maxDim 6
-    50:  SecantNewton
-    51:  SecantNewton -iterate initial
-    52:  SecantNewton -increment initial 
-    53:  SecantNewton -iterate initial -increment initial
-    60:  BFGS
-    70:  Broyden    
-    80:  PeriodicNewton
-    90:  User-defined0
-    
-    About User-defined algoType:
-        If special algorithm is to be used, SmartAyalize provides 3 user-defined algorithms.
-        The script author should specify the algorithm as a procedure in the script.
-        The script name must be `UserAlgorithm0`, `UserAlgorithm1`, `UserAlgorithm2`.
-        Example see section Example No. 4.
-        
+    The work flow, the control parameters and the algorithm type flags are documented in README.md next to this file.
+    
     Change Log
     ---------------------------------------------------------------------------
     Mon Jun 29 16:10:18 2020 v0.0
         Creat SmartAnalyze.py file.
+    Sun Oct 18 2026 v0.1
+        Leveled logging (logLevel, printInterval, logFile) replaces the unconditional prints and printPer.
+        IterativeAnalyze replaces the recursion of RecursiveAnalyze, with maxSplitDepth.
+        Adaptive step length (AdaptiveAnalyze), learned algorithm order, and blocks of pieces per analyze call (BlockAnalyze).
+        Algorithm registry with RegisterAlgorithm and ValidateAlgorithms for the user-defined types 90-92; fix type 22.
+        StaticSegments and ReversalPoints for the static protocol.
+        Checkpoints with resume (RESUMED), in-memory probes and the profile summary.
         
 """
 
 from openseespy.opensees import * 
+import csv
+import json
+import math
+import multiprocessing
+import os
+import pickle
+import signal
+import sys
+import threading
 import time
 
+import numpy as np
+
+# logging levels of control['logLevel']
+LOG_SILENT=0
+LOG_SUMMARY=1
+LOG_PROGRESS=2
+LOG_DEBUG=3
+LOG_LEVELS={'silent':LOG_SILENT, 'summary':LOG_SUMMARY, 'progress':LOG_PROGRESS, 'debug':LOG_DEBUG}
+
+# return code of the drivers in a failed process whose analysis was resumed in the snapshot process of a checkpoint
+RESUMED=-2
+
+# algorithm type flags and the arguments of the OpenSees algorithm command, see the reference in README.md
+ALGORITHMS={
+    0:('Linear',),
+    1:('Linear', '-initial'),
+    2:('Linear', '-factorOnce'),
+    10:('Newton',),
+    11:('Newton', '-initial'),
+    12:('Newton', '-initialThenCurrent'),
+    20:('NewtonLineSearch',),
+    21:('NewtonLineSearch', '-type', 'Bisection'),
+    22:('NewtonLineSearch', '-type', 'Secant'),
+    23:('NewtonLineSearch', '-type', 'RegulaFalsi'),
+    30:('ModifiedNewton',),
+    31:('ModifiedNewton', '-initial'),
+    40:('KrylovNewton',),
+    41:('KrylovNewton', '-iterate', 'initial'),
+    42:('KrylovNewton', '-increment', 'initial'),
+    43:('KrylovNewton', '-iterate', 'initial', '-increment', 'initial'),
+    44:('KrylovNewton', '-maxDim', 50),
+    45:('KrylovNewton', '-iterate', 'initial', '-increment', 'initial', '-maxDim', 50),
+    50:('SecantNewton',),
+    51:('SecantNewton', '-iterate', 'initial'),
+    52:('SecantNewton', '-increment', 'initial'),
+    53:('SecantNewton', '-iterate', 'initial', '-increment', 'initial'),
+    60:('BFGS',),
+    70:('Broyden',),
+    80:('PeriodicNewton',),
+}
+_algorithmNames={flag:' '.join(str(arg) for arg in args) for flag, args in ALGORITHMS.items()}
+
+# user-defined algorithm type flags and the function names looked up in the main script
+USER_ALGORITHMS={90:'UserAlgorithm0', 91:'UserAlgorithm1', 92:'UserAlgorithm2'}
+_userAlgorithms={}
+
+# the algorithm type set last by setAlgorithm
+_activeAlgorithm=None
+
+# probe queries, called with the probe arguments, see README.md
+PROBE_QUERIES={
+    'getTime':getTime,
+    'nodeDisp':nodeDisp,
+    'nodeVel':nodeVel,
+    'nodeAccel':nodeAccel,
+    'nodeReaction':nodeReaction,
+    'eleForce':eleForce,
+    'basicForce':basicForce,
+    'eleResponse':eleResponse,
+    'sectionForce':sectionForce,
+    'sectionDeformation':sectionDeformation,
+}
+
+# the snapshot process of the last checkpoint, {'pid': process id, 'pipe': write end of its pipe}
+_snapshot=None
+
+# the convergence test queries were renamed in newer OpenSeesPy versions
+try:
+    getCTestNorms
+except NameError:
+    getCTestNorms=testNorms
+    getCTestIter=testIter
+
 
 def SmartAnalyzeTransient(dt, npts, ud=''):
     '''
@@ -192,55 +188,126 @@ def SmartAnalyzeTransient(dt, npts, ud=''):
     control['tryLooseTestTol']=False
     control['looseTestTolTo']=1.0
     control['tryAlterAlgoTypes']=False
-    control['algoTypes']=[40]                              
+    control['algoTypes']=[40]
+    control['learnAlgoOrder']=False
+    control['algoDecay']=0.98                              
     control['initialStep']=dt
     control['relaxation']=0.5
     control['minStep']=1.0e-6
-    control['printPer']=10
+    control['maxSplitDepth']=100
+    control['adaptiveStep']=False
+    control['maxStep']=dt
+    control['growFactor']=1.5
+    control['growAfter']=3
+    control['cheapIter']=3
+    control['blockSteps']=1
+    control['logLevel']='progress'
+    control['printInterval']=10.0
+    control['logFile']=None
     control['debugMode']=False
+    control['checkpointEvery']=0
+    control['checkpointInterval']=0.0
+    control['resumeControls']=[]
+    control['probes']=None
+    control['profile']=False
+    control['profileFile']=None
+    control['traceFile']=None
     
     # set user control parameters
     if ud!='':
         userControl=ud                                      
         control.update(userControl)
     
-    print("Control parameters:")
-    for key,value in control.items():
-        print(key, value)
+    OpenLog(control)
+    if control['logLevel']>=LOG_DEBUG:
+        Log(control, "Control parameters:")
+        for key,value in control.items():
+            Log(control, "%s %s", key, value)
+    
+    # check the algorithm types and probes once
+    errors=ValidateAlgorithms(control['algoTypes'])+ValidateProbes(control['probes'])
+    if errors:
+        if control['logLevel']>=LOG_SUMMARY:
+            for error in errors:
+                Log(control, error)
+        CloseLog(control)
+        return Result(control, None, -1)
     
     # initialize analyze commands
     test(control['testType'],control['testTol'],control['testIterTimes'],control['testPrintFlag'])
-    setAlgorithm(control['algoTypes'][0])
+    setAlgorithm(control['algoTypes'][0], control, True)
     analysis('Transient')
     
     # set an array to store current status.
     current={}
     current['startTime']=time.time()
-    current['algoIndex']=0
+    current['algoType']=control['algoTypes'][0]
+    current['algoOrder']=list(range(len(control['algoTypes'])))
+    current['algoStats']={}
     current['testIterTimes']=control['testIterTimes']
     current['testTol']=control['testTol']
     current['counter']=0
     current['progress']=0
+    current['adaptStep']=abs(control['initialStep'])
+    current['cheapRuns']=0
+    current['block']=1
     current['segs']=npts
+    current['probes']=OpenProbes(control['probes'], npts)
+    current['profile']=OpenProfile(control)
+    StartCheckpoints(control, current)
     
-    # divide the whole process into segments.
+    # divide the whole process into segments, several of them at once in blocks.
     #鎶婃椂绋嬫寜鐓ф暟鎹偣鍒嗕负鍚勪釜灏忔seg杩涜鍒嗘瀽
-    for seg in range(1,npts+1):
-        ok=RecursiveAnalyze(control['initialStep'],0,control['testIterTimes'],control['testTol'],control,current)
+    seg=0
+    while seg<npts:
+        if current['profile'] is not None:
+            mark=ProfileMark(current['profile'])
+        steps=1
+        if control['adaptiveStep']:
+            ok=AdaptiveAnalyze(dt,control,current)
+        elif control['blockSteps']>1:
+            ok,steps=BlockAnalyze(control['initialStep'],min(current['block'],control['blockSteps'],npts-seg),control,current)
+        else:
+            ok=IterativeAnalyze(control['initialStep'],0,control['testIterTimes'],control['testTol'],control,current)
+        if current['profile'] is not None:
+            ProfilePiece(current['profile'], mark, current['progress']+steps, steps*dt, ok)
         #濡傛灉閫掑綊鍚庝笉鏀舵暃锛岃烦鍑哄嚱鏁帮紝鏄剧ず鍒嗘瀽澶辫触鍜岀敤鏃�
         if ok<0:
-            print(">>> SmartAnalyze: Analyze failed. Time consumption: %f s." %(time.time()-current['startTime']))
-            return ok
+            if control['logLevel']>=LOG_SUMMARY:
+                Log(control, ">>> SmartAnalyze: Analyze failed. Time consumption: %f s.", time.time()-current['startTime'])
+                if control['learnAlgoOrder']:
+                    ReportAlgorithms(control, current)
+            if ResumeFromCheckpoint(control, current) is not None:
+                return Result(control, current, RESUMED)
+            if current['profile'] is not None:
+                ProfileReport(control, current, ok)
+            CloseLog(control)
+            return Result(control, current, ok)
         
         #璇ユ暟鎹偣鍒嗘瀽鏀舵暃锛屾洿鏂版垚鍔熷垎鏋愮殑鐐规暟
+        seg+=steps
         current['progress']=seg
+        if current['probes'] is not None:
+            SampleProbes(current['probes'])
         
         #鏄剧ず瀹炴椂鎴愬姛鍒嗘瀽鐨勮繃绋嬪崰鎬昏繃绋嬬殑鐧惧垎姣�
-        if control['debugMode']:
-            print("*** SmartAnalyze: progress %f" %(current['progress']/current['segs']))
+        if control['logLevel']>=LOG_PROGRESS:
+            LogProgress(control, current)
+        
+        # keep the converged state; a resumed snapshot process goes on from here
+        if control['checkpointEvery'] or control['checkpointInterval']:
+            CheckpointIfDue(control, current)
     
     #鍏ㄩ儴鏁版嵁鐐瑰垎鏋愭垚鍔燂紝鏄剧ず鍒嗘瀽鎴愬姛鍜岀敤鏃�
-    print(">>> SmartAnalyze: Successfully finished! Time consumption: %f s." %(time.time()-current['startTime']))
+    if control['logLevel']>=LOG_SUMMARY:
+        Log(control, ">>> SmartAnalyze: Successfully finished! Time consumption: %f s.", time.time()-current['startTime'])
+        if control['learnAlgoOrder']:
+            ReportAlgorithms(control, current)
+    ReleaseCheckpoint()
+    if current['profile'] is not None:
+        ProfileReport(control, current, 0)
+    CloseLog(control)
+    return Result(control, current, 0)
 
 
 def SmartAnalyzeStatic(node, dof, maxStep, targets, ud=''):
@@ -271,94 +338,230 @@ def SmartAnalyzeStatic(node, dof, maxStep, targets, ud=''):
     control['looseTestTolTo']=1.0
     control['tryAlterAlgoTypes']=False
     control['algoTypes']=[40]
+    control['learnAlgoOrder']=False
+    control['algoDecay']=0.98
     control['initialStep']=initialStep
     control['relaxation']=0.5
     control['minStep']=1.0e-6
-    control['printPer']=10
+    control['maxSplitDepth']=100
+    control['adaptiveStep']=False
+    control['maxStep']=maxStep
+    control['growFactor']=1.5
+    control['growAfter']=3
+    control['cheapIter']=3
+    control['blockSteps']=1
+    control['logLevel']='progress'
+    control['printInterval']=10.0
+    control['logFile']=None
     control['debugMode']=False
+    control['checkpointEvery']=0
+    control['checkpointInterval']=0.0
+    control['resumeControls']=[]
+    control['probes']=None
+    control['profile']=False
+    control['profileFile']=None
+    control['traceFile']=None
     
     # set user control parameters
     if ud!='':
         userControl=ud
         control.update(userControl)
     
-    print("Control parameters:")
-    for key,value in control.items():
-        print(key, value)
+    OpenLog(control)
+    if control['logLevel']>=LOG_DEBUG:
+        Log(control, "Control parameters:")
+        for key,value in control.items():
+            Log(control, "%s %s", key, value)
+    
+    # check the algorithm types and probes once
+    errors=ValidateAlgorithms(control['algoTypes'])+ValidateProbes(control['probes'])
+    if errors:
+        if control['logLevel']>=LOG_SUMMARY:
+            for error in errors:
+                Log(control, error)
+        CloseLog(control)
+        return Result(control, None, -1)
     
     # initialize analyze commands
     test(control['testType'],control['testTol'],control['testIterTimes'],control['testPrintFlag'])
-    setAlgorithm(control['algoTypes'][0])
+    setAlgorithm(control['algoTypes'][0], control, True)
     integrator('DisplacementControl', node, dof, initialStep)
     analysis('Static')
     
     # set an array to store current status.
     current={}
     current['startTime']=time.time()
-    current['algoIndex']=0
+    current['algoType']=control['algoTypes'][0]
+    current['algoOrder']=list(range(len(control['algoTypes'])))
+    current['algoStats']={}
     current['testIterTimes']=control['testIterTimes']
     current['testTol']=control['testTol']
     current['counter']=0
     current['progress']=0
+    current['adaptStep']=abs(control['initialStep'])
+    current['cheapRuns']=0
+    current['block']=1
     current['step']=initialStep
     current['node']=node
     current['dof']=dof
     
-    # calcuate whole distance; divide the whole process into segments.
-    distance=0
-    segs=[]                                          #鎶婃暣涓姞杞借繃绋嬪垎瑙ｄ负闀垮害涓嶈秴杩噈axStep鐨勶紝甯︽璐熸柟鍚戠殑灏忓姞杞芥
-    for i in range(len(targets)):                    #鐩爣浣嶇Щ鍒楄〃寰幆
-        if i==0:                                     #绗竴娈典綅绉�
-            section=targets[0]                       #鎺ㄨ浣嶇Щ鐩存帴灏辨槸鍒楄〃绗竴涓綅绉�
-            positive=True                            #姝ｅ悜 
-        else:                                        #闈炵涓€娈典綅绉�
-            section=targets[i]-targets[i-1]          #鎺ㄨ浣嶇Щ涓虹洰鏍囦綅绉诲噺鍘讳笂涓€娈电洰鏍囦綅绉�
-            if section>=0:                           #鑻ュぇ浜庨浂涓烘鍚戞帹
-                positive=True           
-            else:                                    #鑻ュ皬浜庨浂涓鸿礋鍚戞帹
-                positive=False
-        
-        distance=distance+abs(section)               #鎵€鎺ㄧ殑缁濆浣嶇Щ鎬诲拰锛宻ection涓烘瘡娆″崟鎺ㄧ殑璺濈
-        
-        if positive:                                 #鑻ョ洰鍓嶅浜庢鍚戝姞杞�
-            j=0
-            while (section-j*maxStep)>maxStep:       #鎶婃湰娈垫帹瑕嗕綅绉诲垎涓洪暱搴︿负maxStep鐨勫悇涓皬娈碉紝瀛樹簬鍒楄〃segs涓�
-                segs.append(maxStep)
-                j+=1
-            segs.append(section-j*maxStep)           #鏈€鍚庝竴灏忔涓嶈冻maxStep鐨勪篃瀛樹簬segs
-            
-        else:                                        #鑻ョ洰鍓嶅浜庤礋鍚戝姞杞�
-            j=0
-            while (-section-j*maxStep)>maxStep:      #鎶婃湰娈垫帹瑕嗕綅绉诲垎涓洪暱搴︿负maxStep鐨勫悇涓皬娈碉紝瀛樹簬鍒楄〃segs涓�
-                segs.append(-maxStep)
-                j+=1
-            segs.append(section+j*maxStep)           #鏈€鍚庝竴灏忔涓嶈冻maxStep鐨勪篃瀛樹簬segs
-    
+    # divide the whole process into segments; a section or remainder shorter than minStep is merged.
+    segs, segTargets=StaticSegments(targets, maxStep, control['minStep'])
+    segs=segs.tolist()
     current['segs']=len(segs)                        #鏁翠釜鍔犺浇杩囩▼涓墍鏈夊皬鍔犺浇娈电殑涓暟
-    
-    # Run recursive analysis
+    current['segTargets']=segTargets
+    current['probes']=OpenProbes(control['probes'], len(segs))
+    current['profile']=OpenProfile(control)
+    StartCheckpoints(control, current)
+    
+    # the number of equal segments from each segment on, a block never spans two different segments
+    equal=[1]*len(segs)
+    for index in range(len(segs)-2, -1, -1):
+        if segs[index]==segs[index+1]:
+            equal[index]=equal[index+1]+1
+    
+    # Run analysis
     #瀵规瘡涓皬鍔犺浇娈佃繘琛岃绠�
-    for seg in segs:
-        ok=RecursiveAnalyze(seg, 0, control['testIterTimes'], control['testTol'], control, current)
+    index=0
+    while index<len(segs):
+        seg=segs[index]
+        if current['profile'] is not None:
+            mark=ProfileMark(current['profile'])
+        steps=1
+        if control['adaptiveStep']:
+            ok=AdaptiveAnalyze(seg, control, current)
+        elif control['blockSteps']>1:
+            ok,steps=BlockAnalyze(seg, min(current['block'], control['blockSteps'], equal[index]), control, current)
+        else:
+            ok=IterativeAnalyze(seg, 0, control['testIterTimes'], control['testTol'], control, current)
+        if current['profile'] is not None:
+            ProfilePiece(current['profile'], mark, current['progress']+steps, steps*seg, ok)
         if ok<0:               #鑻ヤ笉鏀舵暃锛岃烦鍑哄嚱鏁板苟鏄剧ず鐢ㄦ椂
-            print(">>> SmartAnalyze: Analyze failed. Time consumption: %f s." %(time.time()-current['startTime']))
-            return ok
+            if control['logLevel']>=LOG_SUMMARY:
+                Log(control, ">>> SmartAnalyze: Analyze failed. Time consumption: %f s.", time.time()-current['startTime'])
+                if control['learnAlgoOrder']:
+                    ReportAlgorithms(control, current)
+            if ResumeFromCheckpoint(control, current) is not None:
+                return Result(control, current, RESUMED)
+            if current['profile'] is not None:
+                ProfileReport(control, current, ok)
+            CloseLog(control)
+            return Result(control, current, ok)
         #鏀舵暃锛屾垚鍔熷垎鏋愮殑杩囩▼鏁�+1
-        current['progress']+=1
+        index+=steps
+        current['progress']+=steps
+        if current['probes'] is not None:
+            SampleProbes(current['probes'])
         
         #鏄剧ず鎴愬姛鍒嗘瀽鐨勮繃绋嬫暟鍗犳€荤殑鍔犺浇娈垫暟鐨勭櫨鍒嗘瘮
-        if control['debugMode']:
-            print("*** SmartAnalyze: progress %f" %(current['progress']/current['segs']))
+        if control['logLevel']>=LOG_PROGRESS:
+            LogProgress(control, current)
+        
+        # keep the converged state; a resumed snapshot process goes on from here
+        if control['checkpointEvery'] or control['checkpointInterval']:
+            CheckpointIfDue(control, current)
     
     #鍏ㄩ儴鍔犺浇娈靛垎鏋愬畬鎴愶紝鏄剧ず鎴愬姛瀹屾垚鍒嗘瀽鍜岀敤鏃�
-    print(">>> SmartAnalyze: Successfully Finished! Time consumption: %f s." %(time.time()-current['startTime']))
+    if control['logLevel']>=LOG_SUMMARY:
+        Log(control, ">>> SmartAnalyze: Successfully Finished! Time consumption: %f s.", time.time()-current['startTime'])
+        if control['learnAlgoOrder']:
+            ReportAlgorithms(control, current)
+    ReleaseCheckpoint()
+    if current['profile'] is not None:
+        ProfileReport(control, current, 0)
+    CloseLog(control)
+    return Result(control, current, 0)
     
     
     
     
     
 
-def RecursiveAnalyze(step, algoIndex, testIterTimes, testTol, vcontrol, vcurrent):
+def StaticSegments(targets, maxStep, tol=1.0e-6):
+    '''
+    Divide a loading protocol into DisplacementControl segments no longer than maxStep.
+    targets: a list of target displacements
+    maxStep: the maximum step length
+    tol: a target closer than tol to the previous one is skipped, a remainder shorter than tol is merged into the last full step
+    return: (steps, targetIndex), arrays of the signed segment lengths and of the index in targets each segment moves towards
+    '''
+    targets=np.asarray(targets, dtype=float)
+    
+    # skip the targets that are reached already
+    kept=[]
+    position=0.0
+    for index, target in enumerate(targets.tolist()):
+        if abs(target-position)>=tol:
+            kept.append(index)
+            position=target
+    kept=np.array(kept, dtype=int)
+    if len(kept)==0:
+        return np.zeros(0), kept
+    
+    sections=np.diff(targets[kept], prepend=0.0)
+    lengths=np.abs(sections)
+    full=np.floor(lengths/maxStep)
+    counts=(full+(lengths-full*maxStep>=tol)).astype(int)
+    counts[counts==0]=1
+    
+    # full steps, then the last step of each section takes what is left of it
+    direction=np.sign(sections)
+    steps=np.repeat(direction*maxStep, counts)
+    last=np.cumsum(counts)-1
+    steps[last]=sections-direction*(counts-1)*maxStep
+    return steps, np.repeat(kept, counts)
+
+
+def ReversalPoints(history, tol=0.0):
+    '''
+    Reduce a measured displacement history to its reversal points, to be used as targets of SmartAnalyzeStatic.
+    The history is taken to start from zero, like the analysis. A reversal smaller than tol is noise and is skipped,
+    the last sample is always kept.
+    history: a list of displacements
+    tol: the noise tolerance, in the units of history
+    return: (targets, indices), arrays of the reversal displacements and of their indices in history;
+            the samples indices[k-1]+1 ... indices[k] lie on the branch towards targets[k]
+    '''
+    history=np.asarray(history, dtype=float)
+    if len(history)==0:
+        return np.zeros(0), np.zeros(0, dtype=int)
+    
+    # turning points of the raw history, ignoring repeated samples
+    moves=np.flatnonzero(np.diff(history))
+    direction=np.sign(np.diff(history)[moves])
+    turns=moves[np.flatnonzero(direction[1:]!=direction[:-1])]+1
+    candidates=[0]+turns.tolist()+[len(history)-1]
+    
+    # keep a turning point once the history has come back from it by more than tol
+    indices=[]
+    peak=None
+    sense=0
+    position=0.0
+    for index in candidates:
+        value=history[index]
+        if sense==0:
+            if abs(value-position)>tol:
+                sense=1 if value>position else -1
+                peak=index
+        elif (value-history[peak])*sense>0:
+            peak=index
+        elif abs(value-history[peak])>tol:
+            indices.append(peak)
+            sense=-sense
+            peak=index
+    if peak is not None:
+        indices.append(peak)
+    last=len(history)-1
+    if indices and history[indices[-1]]==history[last]:
+        indices[-1]=last
+    elif not indices or indices[-1]!=last:
+        indices.append(last)
+    
+    indices=np.array(indices, dtype=int)
+    return history[indices], indices
+
+
+def IterativeAnalyze(step, algoIndex, testIterTimes, testTol, vcontrol, vcurrent):
     '''
     step: 姝ラ暱锛屽姩鍔涘垎鏋愪负dt; 闈欏姏鍒嗘瀽涓哄皬鍔犺浇娈电殑浣嶇Щ锛�<=maxStep
     algoIndex: 鍒濆杩唬鏂规硶鍒楄〃鐨勫簭鍙凤紝涓€鑸粠绗竴涓紑濮嬶紝鍗充负0
@@ -369,286 +572,887 @@ def RecursiveAnalyze(step, algoIndex, testIterTimes, testTol, vcontrol, vcurrent
     '''
     control=vcontrol
     current=vcurrent
-    
-    print('CONTROL PARAMETERS:')
-    print(control)
-    print('CURRENT STATE PARAMETERS:')
-    print(current)
-    print('\n')
-    
-    #杈撳嚭鏈鍒嗘瀽鐨勫弬鏁�
-    if control['debugMode']:
-        print("*** SmartAnalyze: Run Recursive: step=%f, algoI=%i, times=%i, tol=%f" %(step, algoIndex, testIterTimes, testTol))
-        print('\n')
-    
-    #鏀瑰彉杩唬鏂规硶
-    if algoIndex!=current['algoIndex']:
-        print(">>> SmartAnalyze: Setting algorithm to %i" %(control['algoTypes'][algoIndex]))
-        print('\n')
-        setAlgorithm(control['algoTypes'][algoIndex])
-        current['algoIndex']=algoIndex
-    
-    #鍙樺寲杩唬娆℃暟鍜屽宸�
-    if testIterTimes!=current['testIterTimes'] or testTol!=current['testTol']:
-        if testIterTimes!=current['testIterTimes']:
-            print(">>> SmartAnalyze: Setting test iteration times to %i" %(testIterTimes))
-            print('\n')
-            current['testIterTimes']=testIterTimes
-        if testTol!=current['testTol']:
-            print("SmartAnalyze: Setting test tolerance to %f" %(testTol))
-            print('\n')
-            current['testTol']=testTol
-            
-        test(control['testType'], testTol, testIterTimes, control['testPrintFlag'])
-    
-    #闈欏姏鍒嗘瀽淇敼姝ラ暱
-    if control['analysis']=='Static' and current['step']!=step:
-        print(">>> SmartAnalyze: Setting step to %f" %(step))
-        print('\n')
-        integrator('DisplacementControl', current['node'], current['dof'], step)
-        current['step']=step
-    
-    # trial analyze once
-    #闈欏姏鍒嗘瀽
-    if control['analysis']=='Static':
-        ok=analyze(1)
-    #鍔ㄥ姏鍒嗘瀽
-    else:
-        ok=analyze(1, step)
-    
-    #鍗曟鍒嗘瀽娆℃暟璁板綍
-    current['counter']+=1
-    
-    #鍒嗘瀽鏀舵暃 璺冲嚭鍑芥暟 寮€濮嬩笅涓€灏忔鐨勮绠�
-    if ok==0:
-        #婊℃寚瀹氭鏁板氨杈撳嚭瀹屾垚鐧惧垎姣斿拰鐢ㄦ椂
-        if current['counter']>=control['printPer']:
-            print("* SmartAnalyze: progress %f. Time consumption: %f s." 
-                  %(current['progress']/current['segs'], (time.time()-current['startTime'])/1000.0))
-            print('\n')
-            current['counter']=0
-        return 0
-    
-    # 鍒嗘瀽涓嶆敹鏁� 寮€濮嬫敼鍙樺弬鏁伴€掑綊
-    # Add test iteration times. Use current step, algorithm and test tolerance.
-    if control['tryAddTestTimes'] and testIterTimes!=control['testIterTimesMore']:
-        #妫€鏌ヨ寖鏁�
-        norm=getCTestNorms()
-        #濡傛灉鑼冩暟灏忎簬瑙勫畾鍊硷紝澧炲姞杩唬娆℃暟锛屽叾浠栧弬鏁颁笉鍙橈紝鏈嚱鏁伴€掑綊
-        if norm[-1]<control['normTol']:
-            print(">>> SmartAnalyze: Adding test times to %i." %(control['testIterTimesMore']))
-            print('\n')
-            return RecursiveAnalyze(step, algoIndex, control['testIterTimesMore'], testTol, control, current)
-        #濡傛灉鑼冩暟澶т簬瑙勫畾鍊硷紝涓嶅鍔�
+    level=control['logLevel']
+    static=control['analysis']=='Static'
+    algoTypes=control['algoTypes']
+    minStep=control['minStep']
+    learn=control['learnAlgoOrder']
+    if learn:
+        OrderAlgorithms(control, current)
+    order=current['algoOrder']
+    prof=current['profile']
+    timed=learn or prof is not None
+    
+    # pending sub-steps, the top one is analyzed next: (step, algoIndex, testIterTimes, testTol, depth)
+    pending=[(step, algoIndex, testIterTimes, testTol, 0)]
+    divided=False
+    largest=0.0
+    while pending:
+        step, algoIndex, testIterTimes, testTol, depth=pending.pop()
+        
+        if level>=LOG_DEBUG:
+            Log(control, "*** SmartAnalyze: Run Iterative: step=%f, algoI=%i, times=%i, tol=%f, depth=%i", step, algoIndex, testIterTimes, testTol, depth)
+        
+        # set algorithm
+        algoType=algoTypes[order[algoIndex]]
+        if algoType!=current['algoType']:
+            if level>=LOG_DEBUG:
+                Log(control, ">>> SmartAnalyze: Setting algorithm to %i", algoType)
+            setAlgorithm(algoType, control)
+            current['algoType']=algoType
+            if prof is not None:
+                prof['algorithmSwitches']+=1
+        
+        # set test iteration times and tolerance
+        if testIterTimes!=current['testIterTimes'] or testTol!=current['testTol']:
+            if testIterTimes!=current['testIterTimes']:
+                if level>=LOG_DEBUG:
+                    Log(control, ">>> SmartAnalyze: Setting test iteration times to %i", testIterTimes)
+                current['testIterTimes']=testIterTimes
+            if testTol!=current['testTol']:
+                if level>=LOG_DEBUG:
+                    Log(control, "SmartAnalyze: Setting test tolerance to %f", testTol)
+                current['testTol']=testTol
+            test(control['testType'], testTol, testIterTimes, control['testPrintFlag'])
+        
+        # set static step
+        if static and current['step']!=step:
+            if level>=LOG_DEBUG:
+                Log(control, ">>> SmartAnalyze: Setting step to %f", step)
+            integrator('DisplacementControl', current['node'], current['dof'], step)
+            current['step']=step
+            if prof is not None:
+                prof['stepChanges']+=1
+        
+        # trial analyze once
+        if timed:
+            start=time.perf_counter()
+        if static:
+            ok=analyze(1)
         else:
-            print(">>> SmartAnalyze: Not adding test times for norm %f" %(norm[-1]))
-            print('\n')
-    
-    # Change algorithm. Set back test iteration times.
-    # 濡傛灉杩唬鏂规硶搴忓彿杩樻病瓒� 灏濊瘯涓嬩竴绉嶈凯浠ｆ柟娉�
-    if control['tryAlterAlgoTypes'] and (algoIndex+1)<len(control['algoTypes']):
-        algoIndex+=1
-        print(">>> SmartAnalyze: Setting algorithm to  %i." %(control['algoTypes'][algoIndex]))
-        print('\n')
-        return RecursiveAnalyze(step, algoIndex, testIterTimes, testTol, control, current)
-    
-    # If step length is too small, try add test tolerance. set algorithm and test iteration times back.
-    if abs(step)<2*control['minStep']:
-        print(">>> SmartAnalyze: current step %f is too small!" %(step))
-        print('\n')
-        if control['tryLooseTestTol'] and current['testTol']!=control['looseTestTolTo']:
-            print("!!! SmartAnalyze: Warning: Loosing test tolerance")
-            print('\n')
-            return RecursiveAnalyze(step, 0, control['testIterTimes'], control['looseTestTolTo'], control, current)
+            ok=analyze(1, step)
+        current['counter']+=1
+        if timed:
+            seconds=time.perf_counter()-start
+            if learn:
+                RecordAlgorithm(control, current, algoType, ok, seconds)
+            if prof is not None:
+                ProfileTrial(prof, algoType, ok, seconds)
         
-        # Here, all methods have been tried. Return negative value.
-        return -1
-    
-    # Split the current step into two steps.
-    stepNew=step*control['relaxation']
-    if stepNew>0 and stepNew<control['minStep']:
-        stepNew=control['minStep']
-    
-    if stepNew<0 and stepNew>-control['minStep']:
-        stepNew=-control['minStep']
-    
-    stepRest=step-stepNew
-    print(">>> SmartAnalyze: Dividing the current step %f into %f and %f" %(step, stepNew, stepRest))
-    print('\n')
-    ok=RecursiveAnalyze(stepNew, 0, testIterTimes, testTol, control, current)
-    if ok<0:
-        return -1
-    ok=RecursiveAnalyze(stepRest, 0, testIterTimes, testTol, control, current)
-    if ok<0:
-        return -1
-    return 1
+        if ok==0:
+            if divided and abs(step)>largest:
+                largest=abs(step)
+            continue
         
+        # Add test iteration times. Use current step, algorithm and test tolerance.
+        if control['tryAddTestTimes'] and testIterTimes!=control['testIterTimesMore']:
+            norm=getCTestNorms()
+            if norm[-1]<control['normTol']:
+                if level>=LOG_DEBUG:
+                    Log(control, ">>> SmartAnalyze: Adding test times to %i.", control['testIterTimesMore'])
+                pending.append((step, algoIndex, control['testIterTimesMore'], testTol, depth))
+                if prof is not None:
+                    prof['testTimesAdded']+=1
+                continue
+            if level>=LOG_DEBUG:
+                Log(control, ">>> SmartAnalyze: Not adding test times for norm %f", norm[-1])
         
-    
+        # Change algorithm. Set back test iteration times.
+        if control['tryAlterAlgoTypes'] and (algoIndex+1)<len(algoTypes):
+            if level>=LOG_DEBUG:
+                Log(control, ">>> SmartAnalyze: Setting algorithm to  %i.", algoTypes[order[algoIndex+1]])
+            pending.append((step, algoIndex+1, testIterTimes, testTol, depth))
+            continue
+        
+        # If step length is too small, try add test tolerance. set algorithm and test iteration times back.
+        if abs(step)<2*minStep:
+            if level>=LOG_PROGRESS:
+                Log(control, ">>> SmartAnalyze: current step %f is too small!", step)
+            if control['tryLooseTestTol'] and current['testTol']!=control['looseTestTolTo']:
+                if level>=LOG_PROGRESS:
+                    Log(control, "!!! SmartAnalyze: Warning: Loosing test tolerance")
+                pending.append((step, 0, control['testIterTimes'], control['looseTestTolTo'], depth))
+                if prof is not None:
+                    prof['toleranceLoosenings']+=1
+                continue
+            
+            # Here, all methods have been tried. Return negative value.
+            return -1
+        
+        if depth>=control['maxSplitDepth']:
+            if level>=LOG_PROGRESS:
+                Log(control, ">>> SmartAnalyze: maximum split depth %i reached at step %f!", depth, step)
+            return -1
+        
+        # Split the current step into two steps, the first piece is analyzed first.
+        stepNew=step*control['relaxation']
+        if stepNew>0 and stepNew<minStep:
+            stepNew=minStep
+        
+        if stepNew<0 and stepNew>-minStep:
+            stepNew=-minStep
+        
+        stepRest=step-stepNew
+        if level>=LOG_DEBUG:
+            Log(control, ">>> SmartAnalyze: Dividing the current step %f into %f and %f", step, stepNew, stepRest)
+        pending.append((stepRest, 0, testIterTimes, testTol, depth+1))
+        pending.append((stepNew, 0, testIterTimes, testTol, depth+1))
+        divided=True
+        if prof is not None:
+            ProfileSplit(prof, depth+1)
+    
+    if divided:
+        current['largestStep']=largest
+        return 1
+    return 0
+
 
-def setAlgorithm(algotype):
+def AdaptiveAnalyze(length, vcontrol, vcurrent):
     '''
-    
+    Analyze one piece in sub-steps of the adaptive step length current['adaptStep'].
+    length: 鍒嗘闀垮害锛屽姩鍔涘垎鏋愪负dt; 闈欏姏鍒嗘瀽涓哄皬鍔犺浇娈电殑浣嶇Щ
+    vcontrol: 鎺у埗鍙傛暟瀛楀吀
+    vcurrent: 鐘舵€佸弬鏁板瓧鍏�
     '''
-    def case0():
-        print("> SmartAnalyze: Setting algorithm to  Linear ...")
-        algorithm('Linear')
-    
-    def case1():
-        print("> SmartAnalyze: Setting algorithm to  Linear -initial ...")
-        algorithm('Linear', initial=True)
-    
-    def case2():
-        print("> SmartAnalyze: Setting algorithm to  Linear -factorOnce ...")
-        algorithm('Linear', factorOnce=True)
+    control=vcontrol
+    current=vcurrent
+    level=control['logLevel']
+    minStep=control['minStep']
+    direction=1 if length>=0 else -1
+    rest=abs(length)
+    result=0
+    while rest>0:
+        # equal sub-steps no longer than the step length
+        pieces=math.ceil(rest/current['adaptStep']-1.0e-9)
+        step=rest/pieces
+        if rest-step<minStep:
+            step=rest
         
-    def case10():
-        print("> SmartAnalyze: Setting algorithm to  Newton ...")
-        algorithm('Newton')
-    
-    def case11():
-        print("> SmartAnalyze: Setting algorithm to  Newton -initial ...")
-        algorithm('Newton', initial=True)
-    
-    def case12():
-        print("> SmartAnalyze: Setting algorithm to  Newton -initialThenCurrent ...")
-        algorithm('Newton', initialThenCurrent=True)
-    
-    def case20():
-        print("> SmartAnalyze: Setting algorithm to  NewtonLineSearch ...")
-        algorithm('NewtonLineSearch')
-    
-    def case21():
-        print("> SmartAnalyze: Setting algorithm to  NewtonLineSearch -type Bisection ...")
-        algorithm('NewtonLineSearch', True)
-    
-    def case22():
-        print("> SmartAnalyze: Setting algorithm to  NewtonLineSearch -type Secant ...")
-        algorithm('NewtonLineSearch', Secant=True)
-    
-    def case23():
-        print("> SmartAnalyze: Setting algorithm to  NewtonLineSearch -type RegulaFalsi ...")
-        algorithm('NewtonLineSearch', RegulaFalsi=True)
-    
-    def case30():
-        print("> SmartAnalyze: Setting algorithm to  Modified Newton ...")
-        algorithm('ModifiedNewton')
-    
-    def case31():
-        print("> SmartAnalyze: Setting algorithm to  ModifiedNewton -initial ...")
-        algorithm('ModifiedNewton', False, True)
-    
-    def case40():
-        print("> SmartAnalyze: Setting algorithm to  KrylovNewton ...")
-        algorithm('KrylovNewton')
-    
-    def case41():
-        print("> SmartAnalyze: Setting algorithm to  KrylovNewton -iterate initial ...")
-        algorithm('KrylovNewton', iterate='initial')
-    
-    def case42():
-        print("> SmartAnalyze: Setting algorithm to  KrylovNewton -increment initial ...")
-        algorithm('KrylovNewton', increment='initial')
-    
-    def case43():
-        print("> SmartAnalyze: Setting algorithm to  KrylovNewton -iterate initial -increment initial ...")
-        algorithm('KrylovNewton', iterate='initial', increment='initial')
-    
-    def case44():
-        print("> SmartAnalyze: Setting algorithm to  KrylovNewton -maxDim 50")
-        algorithm('KrylovNewton', maxDim=50)
-    
-    def case45():
-        print("> SmartAnalyze: Setting algorithm to  KrylovNewton -iterate initial -increment initial -maxDim 50")
-        algorithm('KrylovNewton', iterate='initial', increment='initial', maxDim=50)
-    
-    def case50():
-        print("> SmartAnalyze: Setting algorithm to  SecantNewton ...")
-        algorithm('SecantNewton')
+        counter=current['counter']
+        ok=IterativeAnalyze(direction*step, 0, control['testIterTimes'], control['testTol'], control, current)
+        if ok<0:
+            return ok
+        rest-=step
+        
+        if ok>0:
+            # shrink to the largest piece that converged
+            current['adaptStep']=max(current['largestStep'], minStep)
+            current['cheapRuns']=0
+            result=1
+            if level>=LOG_DEBUG:
+                Log(control, ">>> SmartAnalyze: Shrinking adaptive step to %f", current['adaptStep'])
+        elif pieces==1:
+            # the rest fits in one step, says nothing about the step length
+            pass
+        elif current['counter']==counter+1 and getCTestIter()<=control['cheapIter']:
+            current['cheapRuns']+=1
+            if current['cheapRuns']>=control['growAfter'] and current['adaptStep']<control['maxStep']:
+                current['adaptStep']=min(current['adaptStep']*control['growFactor'], control['maxStep'])
+                current['cheapRuns']=0
+                if level>=LOG_DEBUG:
+                    Log(control, ">>> SmartAnalyze: Growing adaptive step to %f", current['adaptStep'])
+        else:
+            current['cheapRuns']=0
+    return result
 
-    def case51():
-        print("> SmartAnalyze: Setting algorithm to  SecantNewton -iterate initial ...")
-        algorithm('SecantNewton', iterate='initial')
-    
-    def case52():
-        print("> SmartAnalyze: Setting algorithm to  SecantNewton -increment initial  ...")
-        algorithm('SecantNewton', increment='initial')
-    
-    def case53():
-        print("> SmartAnalyze: Setting algorithm to  SecantNewton -iterate initial -increment initial ...")
-        algorithm('SecantNewton', iterate='initial', increment='initial')
-    
-    def case60():
-        print("> SmartAnalyze: Setting algorithm to  BFGS ...")
-        algorithm('BFGS')
-    
-    def case70():
-        print("> SmartAnalyze: Setting algorithm to  Broyden ...")
-        algorithm('Broyden')
-    
-    def case80():
-        print("> SmartAnalyze: Setting algorithm to  PeriodicNewton ...")
-        algorithm('PeriodicNewton')
-    
-    def case90():
-        #UserAlgorithm0
-        pass
+
+def BlockAnalyze(step, steps, vcontrol, vcurrent):
+    '''
+    Analyze a block of equal pieces with one analyze call, the first algorithm and the initial test.
+    analyze keeps the pieces converged before a failure, the piece that failed is analyzed again with IterativeAnalyze.
+    With probes, the pieces of the block are analyzed one by one and sampled, all but the last one.
+    The block size current['block'] doubles up to blockSteps after every block and every single piece converged
+    at the first trial, and drops to one piece after a failure.
+    step: 姝ラ暱锛屽姩鍔涘垎鏋愪负dt; 闈欏姏鍒嗘瀽涓哄皬鍔犺浇娈电殑浣嶇Щ锛�<=maxStep
+    steps: the number of pieces of the block, 1 for a single piece with IterativeAnalyze
+    vcontrol: 鎺у埗鍙傛暟瀛楀吀
+    vcurrent: 鐘舵€佸弬鏁板瓧鍏�
+    return: (ok, number of pieces analyzed), ok as IterativeAnalyze
+    '''
+    control=vcontrol
+    current=vcurrent
+    level=control['logLevel']
+    static=control['analysis']=='Static'
+    prof=current['profile']
+    probes=current['probes']
+    done=0
+    if steps>1:
+        # the algorithm, test and static step of the first trial of IterativeAnalyze
+        algoType=control['algoTypes'][current['algoOrder'][0]]
+        if algoType!=current['algoType']:
+            if level>=LOG_DEBUG:
+                Log(control, ">>> SmartAnalyze: Setting algorithm to %i", algoType)
+            setAlgorithm(algoType, control)
+            current['algoType']=algoType
+            if prof is not None:
+                prof['algorithmSwitches']+=1
+        if current['testIterTimes']!=control['testIterTimes'] or current['testTol']!=control['testTol']:
+            test(control['testType'], control['testTol'], control['testIterTimes'], control['testPrintFlag'])
+            current['testIterTimes']=control['testIterTimes']
+            current['testTol']=control['testTol']
+        if static and current['step']!=step:
+            if level>=LOG_DEBUG:
+                Log(control, ">>> SmartAnalyze: Setting step to %f", step)
+            integrator('DisplacementControl', current['node'], current['dof'], step)
+            current['step']=step
+            if prof is not None:
+                prof['stepChanges']+=1
         
-    def default():
-        print("!!! SmartAnalyze: ERROR! WRONG Algorithm Type!")
-    
-    
-    switch={'0':case0, '1':case1, '2':case2, '10':case10,'11':case11, '12':case12,
-            '20':case20, '21':case21, '21':case21, '23':case23,
-            '30':case30, '31':case31, '40':case40, '41':case41, '42':case42, '43':case43, '44':case44, '45':case45,
-            '50':case50, '51':case51,'52':case52,'53':case53, '60':case60, '70':case70, '80':case80, '90':case90, 'default':default}
-    
-    choice=str(algotype)
-    switch.get(choice, default)()
-    
+        if level>=LOG_DEBUG:
+            Log(control, "*** SmartAnalyze: Run Block: step=%f, steps=%i", step, steps)
+        if prof is not None:
+            start=time.perf_counter()
+        if probes is not None:
+            # sample every piece
+            ok=0
+            while done<steps:
+                ok=analyze(1) if static else analyze(1, step)
+                if ok!=0:
+                    break
+                done+=1
+                if done<steps:
+                    SampleProbes(probes)
+        elif static:
+            position=nodeDisp(current['node'], current['dof'])
+            ok=analyze(steps)
+            if ok!=0:
+                done=int(round((nodeDisp(current['node'], current['dof'])-position)/step))
+        else:
+            position=getTime()
+            ok=analyze(steps, step)
+            if ok!=0:
+                done=int(round((getTime()-position)/step))
+        current['counter']+=1
+        if ok==0:
+            done=steps
+        else:
+            done=min(max(done, 0), steps-1)
+        # one call of many pieces, not a trial of the algorithm statistics of learnAlgoOrder
+        if prof is not None:
+            ProfileTrial(prof, algoType, ok, time.perf_counter()-start)
+            prof['blocks']+=1
+            prof['blockSteps']+=done
+            if ok!=0:
+                prof['failedBlocks']+=1
+        if ok==0:
+            current['block']=min(2*steps, control['blockSteps'])
+            return 0, steps
+        if level>=LOG_DEBUG:
+            Log(control, ">>> SmartAnalyze: Block failed after %i of %i pieces", done, steps)
+    
+    counter=current['counter']
+    ok=IterativeAnalyze(step, 0, control['testIterTimes'], control['testTol'], control, current)
+    if done==0 and ok==0 and current['counter']==counter+1:
+        current['block']=min(2*current['block'], control['blockSteps'])
+    else:
+        current['block']=1
+    return ok, done+1
+
+
+# former name of IterativeAnalyze
+RecursiveAnalyze=IterativeAnalyze
+
+
+def RecordAlgorithm(vcontrol, vcurrent, algoType, ok, seconds):
+    '''
+    Add one trial to the statistics of an algorithm type.
+    The decayed sums [weight, successes, iterations, seconds] order the algorithms,
+    the plain sums [trials, successes, iterations, seconds] are reported.
+    '''
+    stats=vcurrent['algoStats'].get(algoType)
+    if stats is None:
+        stats=vcurrent['algoStats'][algoType]=[[0.0, 0.0, 0.0, 0.0], [0, 0, 0, 0.0]]
+    decayed, total=stats
+    decay=vcontrol['algoDecay']
+    converged=1 if ok==0 else 0
+    iterations=getCTestIter()
+    decayed[0]=decayed[0]*decay+1.0
+    decayed[1]=decayed[1]*decay+converged
+    decayed[2]=decayed[2]*decay+iterations
+    decayed[3]=decayed[3]*decay+seconds
+    total[0]+=1
+    total[1]+=converged
+    total[2]+=iterations
+    total[3]+=seconds
+
+
+def OrderAlgorithms(vcontrol, vcurrent):
+    '''
+    Sort the indices of algoTypes into current['algoOrder'] by the expected time to converge,
+    mean time per trial over success rate. The success rate starts from 1/2 (Laplace rule),
+    an algorithm without trials takes the mean time per trial of the others.
+    Without tryAlterAlgoTypes the order stays that of algoTypes, only the first one is used.
+    '''
+    algoTypes=vcontrol['algoTypes']
+    if not vcontrol['tryAlterAlgoTypes']:
+        vcurrent['algoOrder']=list(range(len(algoTypes)))
+        return
+    allStats=vcurrent['algoStats']
+    weight=sum(stats[0][0] for stats in allStats.values())
+    seconds=sum(stats[0][3] for stats in allStats.values())
+    meanTime=seconds/weight if weight>0 else 0.0
+    
+    def cost(index):
+        stats=allStats.get(algoTypes[index])
+        if stats is None:
+            return meanTime*2.0
+        decayed=stats[0]
+        return (decayed[3]/decayed[0])*(decayed[0]+2.0)/(decayed[1]+1.0)
+    
+    vcurrent['algoOrder']=sorted(range(len(algoTypes)), key=cost)
+
 
+def ReportAlgorithms(vcontrol, vcurrent):
+    '''
+    Log the statistics of every algorithm type tried.
+    '''
+    control=vcontrol
+    order=[control['algoTypes'][index] for index in vcurrent['algoOrder']]
+    Log(control, ">>> SmartAnalyze: Algorithm statistics, final order %s:", order)
+    Log(control, "    %8s %8s %8s %8s %10s %10s", "algoType", "trials", "success", "rate", "mean iter", "mean time")
+    for algoType, stats in sorted(vcurrent['algoStats'].items()):
+        trials, converged, iterations, seconds=stats[1]
+        Log(control, "    %8i %8i %8i %8.3f %10.2f %10.2e", algoType, trials, converged, converged/trials,
+            iterations/trials, seconds/trials)
 
 
+def ValidateProbes(probes):
+    '''
+    Check the probes before an analysis.
+    Return a list of error messages, empty if all probes can be sampled.
+    '''
+    errors=[]
+    if probes is None:
+        return errors
+    for name, spec in probes.items():
+        if isinstance(spec, str):
+            spec=(spec,)
+        if not spec or spec[0] not in PROBE_QUERIES:
+            errors.append("!!! SmartAnalyze: ERROR! WRONG probe %s: %s, the query must be one of %s!"
+                          %(name, spec, sorted(PROBE_QUERIES)))
+    return errors
 
 
+def OpenProbes(probes, capacity):
+    '''
+    Prepare the buffers of the probes.
+    probes: dict of name: (query, *args), None for no probes
+    capacity: the expected number of samples, the buffers grow if it is exceeded
+    return: the probe state used by SampleProbes and ProbeResults, None for no probes
+    '''
+    if probes is None:
+        return None
+    calls=[]
+    for name, spec in probes.items():
+        if isinstance(spec, str):
+            spec=(spec,)
+        calls.append((name, PROBE_QUERIES[spec[0]], tuple(spec[1:])))
+    return {'calls':calls, 'buffers':{}, 'count':0, 'capacity':max(int(capacity), 16),
+            'reactions':any(query is nodeReaction for name, query, args in calls)}
 
 
+def SampleProbes(vprobes):
+    '''
+    Add one row to every probe buffer, called at the end of each converged piece.
+    '''
+    probes=vprobes
+    if probes['reactions']:
+        reactions()
+    row=probes['count']
+    buffers=probes['buffers']
+    if row==probes['capacity']:
+        probes['capacity']*=2
+        for name, buffer in buffers.items():
+            grown=np.empty((probes['capacity'],)+buffer.shape[1:])
+            grown[:row]=buffer[:row]
+            buffers[name]=grown
+    for name, query, args in probes['calls']:
+        value=query(*args)
+        buffer=buffers.get(name)
+        if buffer is None:
+            buffer=buffers[name]=np.empty((probes['capacity'],)+np.shape(value))
+        buffer[row]=value
+    probes['count']=row+1
 
 
+def ProbeResults(vprobes):
+    '''
+    The sampled probes as a dict of name: array, one row per converged piece.
+    '''
+    if vprobes is None:
+        return {}
+    count=vprobes['count']
+    results={}
+    for name, query, args in vprobes['calls']:
+        buffer=vprobes['buffers'].get(name)
+        results[name]=np.zeros(0) if buffer is None else buffer[:count].copy()
+    return results
 
 
+def Result(vcontrol, vcurrent, ok):
+    '''
+    The return value of the drivers: ok, or (ok, probe results) if probes are given.
+    '''
+    if vcontrol['probes'] is None:
+        return ok
+    return ok, ProbeResults(None if vcurrent is None else vcurrent['probes'])
 
 
+def OpenProfile(vcontrol):
+    '''
+    Prepare the profile counters of an analysis, None if profile is False.
+    '''
+    if not vcontrol['profile']:
+        return None
+    return {'analyzeCalls':0, 'converged':0, 'failed':0,
+            'convergedTime':0.0, 'failedTime':0.0, 'convergedIterations':0, 'failedIterations':0,
+            'splits':{}, 'splitCount':0, 'pieceDepth':0,
+            'algorithmSwitches':0, 'stepChanges':0, 'testTimesAdded':0, 'toleranceLoosenings':0,
+            'blocks':0, 'blockSteps':0, 'failedBlocks':0,
+            'algorithms':{}, 'trace':[] if vcontrol['traceFile'] else None}
+
+
+def ProfileTrial(vprofile, algoType, ok, seconds):
+    '''
+    Count one trial analyze call, its test iterations and its time.
+    '''
+    prof=vprofile
+    iterations=getCTestIter()
+    prof['analyzeCalls']+=1
+    if ok==0:
+        prof['converged']+=1
+        prof['convergedTime']+=seconds
+        prof['convergedIterations']+=iterations
+    else:
+        prof['failed']+=1
+        prof['failedTime']+=seconds
+        prof['failedIterations']+=iterations
+    stats=prof['algorithms'].get(algoType)
+    if stats is None:
+        stats=prof['algorithms'][algoType]=[0, 0, 0, 0.0]
+    stats[0]+=1
+    stats[1]+=1 if ok==0 else 0
+    stats[2]+=iterations
+    stats[3]+=seconds
+
+
+def ProfileSplit(vprofile, depth):
+    '''
+    Count one division of a step, depth is the depth of the two new pieces.
+    '''
+    prof=vprofile
+    prof['splits'][depth]=prof['splits'].get(depth, 0)+1
+    prof['splitCount']+=1
+    if depth>prof['pieceDepth']:
+        prof['pieceDepth']=depth
+
+
+def ProfileMark(vprofile):
+    '''
+    The counters before a piece, see ProfilePiece.
+    '''
+    prof=vprofile
+    prof['pieceDepth']=0
+    return (prof['analyzeCalls'], prof['failed'], prof['convergedIterations']+prof['failedIterations'],
+            prof['splitCount'], prof['convergedTime']+prof['failedTime'], time.perf_counter())
+
+
+def ProfilePiece(vprofile, mark, piece, length, ok):
+    '''
+    Add the trace row of a piece: the differences of the counters since ProfileMark.
+    '''
+    prof=vprofile
+    if prof['trace'] is None:
+        return
+    calls, failed, iterations, splits, seconds, start=mark
+    prof['trace'].append((piece, length, ok, prof['analyzeCalls']-calls, prof['failed']-failed,
+                          prof['convergedIterations']+prof['failedIterations']-iterations,
+                          prof['splitCount']-splits, prof['pieceDepth'],
+                          prof['convergedTime']+prof['failedTime']-seconds, time.perf_counter()-start))
+
+
+def ProfileReport(vcontrol, vcurrent, ok):
+    '''
+    Write the profile summary as JSON to profileFile and the per piece trace as CSV to traceFile.
+    profileFile: a file name, a dict to update with the summary, or None to log the summary.
+    '''
+    control=vcontrol
+    current=vcurrent
+    prof=current['profile']
+    wallTime=time.time()-current['startTime']
+    analyzeTime=prof['convergedTime']+prof['failedTime']
+    iterations=prof['convergedIterations']+prof['failedIterations']
+    summary={
+        'ok':ok,
+        'analysis':control['analysis'],
+        'pieces':current['segs'],
+        'progress':current['progress'],
+        'wallTime':wallTime,
+        'analyzeTime':analyzeTime,
+        'pythonTime':wallTime-analyzeTime,
+        'analyzeCalls':prof['analyzeCalls'],
+        'converged':prof['converged'],
+        'failed':prof['failed'],
+        'convergedTime':prof['convergedTime'],
+        'failedTime':prof['failedTime'],
+        'testIterations':iterations,
+        'convergedIterations':prof['convergedIterations'],
+        'failedIterations':prof['failedIterations'],
+        'meanIterations':iterations/prof['analyzeCalls'] if prof['analyzeCalls'] else 0.0,
+        'splits':{str(depth):count for depth, count in sorted(prof['splits'].items())},
+        'algorithmSwitches':prof['algorithmSwitches'],
+        'stepChanges':prof['stepChanges'],
+        'testTimesAdded':prof['testTimesAdded'],
+        'toleranceLoosenings':prof['toleranceLoosenings'],
+        'blocks':prof['blocks'],
+        'blockSteps':prof['blockSteps'],
+        'failedBlocks':prof['failedBlocks'],
+        'algorithms':{str(algoType):{'trials':stats[0], 'converged':stats[1], 'iterations':stats[2], 'time':stats[3]}
+                      for algoType, stats in sorted(prof['algorithms'].items())},
+        'control':{key:control[key] for key in ('testIterTimes', 'testTol', 'algoTypes', 'initialStep',
+                                                'relaxation', 'minStep', 'adaptiveStep', 'blockSteps')},
+    }
+    
+    sink=control['profileFile']
+    if isinstance(sink, str):
+        with open(sink, 'w') as f:
+            json.dump(summary, f, indent=1)
+    elif isinstance(sink, dict):
+        sink.update(summary)
+    elif control['logLevel']>=LOG_SUMMARY:
+        Log(control, ">>> SmartAnalyze: Profile %s", json.dumps(summary))
+    
+    if prof['trace'] is not None:
+        with open(control['traceFile'], 'w', newline='') as f:
+            writer=csv.writer(f)
+            writer.writerow(('piece', 'length', 'ok', 'trials', 'failed', 'iterations', 'splits', 'maxDepth',
+                             'analyzeTime', 'wallTime'))
+            writer.writerows(prof['trace'])
+
 
+def StartCheckpoints(vcontrol, vcurrent):
+    '''
+    Prepare the checkpoints of a new analysis, the checkpoint of the previous analysis is dropped.
+    '''
+    control=vcontrol
+    ReleaseCheckpoint()
+    if control['checkpointEvery'] or control['checkpointInterval']:
+        error=_CheckpointError()
+        if error is not None:
+            CloseLog(control)
+            raise RuntimeError("SmartAnalyze: "+error)
+    vcurrent['checkpointProgress']=0
+    vcurrent['checkpointTime']=time.time()
+    vcurrent['resumeAttempt']=0
 
 
+def CheckpointIfDue(vcontrol, vcurrent):
+    '''
+    Make a checkpoint after checkpointEvery pieces or checkpointInterval seconds since the last one.
+    '''
+    control=vcontrol
+    current=vcurrent
+    every=control['checkpointEvery']
+    interval=control['checkpointInterval']
+    if every and current['progress']-current['checkpointProgress']>=every:
+        Checkpoint(control, current)
+    elif interval and time.time()-current['checkpointTime']>=interval:
+        Checkpoint(control, current)
 
 
+def Checkpoint(vcontrol, vcurrent):
+    '''
+    Keep the converged state in a forked snapshot process, replacing the snapshot of the previous checkpoint.
+    The OpenSees domain, the position in the protocol and the step length are all part of the snapshot.
+    Return False in the running process.
+    The snapshot process waits: it exits when released, and returns True when resumed, with the control parameters changed.
+    '''
+    global _snapshot
+    control=vcontrol
+    current=vcurrent
+    ReleaseCheckpoint()
+    current['checkpointProgress']=current['progress']
+    current['checkpointTime']=time.time()
+    if control['logLevel']>=LOG_DEBUG:
+        Log(control, ">>> SmartAnalyze: Checkpoint at progress %i.", current['progress'])
+    
+    sys.stdout.flush()
+    sys.stderr.flush()
+    read, write=os.pipe()
+    pid=os.fork()
+    if pid:
+        os.close(read)
+        _snapshot={'pid':pid, 'pipe':write}
+        return False
+    
+    # snapshot process, Ctrl-C is for the running process
+    os.close(write)
+    handler=signal.signal(signal.SIGINT, signal.SIG_IGN)
+    with os.fdopen(read, 'rb') as f:
+        data=f.read()
+    if not data:
+        os._exit(0)
+    signal.signal(signal.SIGINT, handler)
+    
+    overrides, attempt=pickle.loads(data)
+    if attempt is not None:
+        current['resumeAttempt']=attempt
+    ResumeControl(control, current, overrides)
+    return True
 
 
+def ResumeControl(vcontrol, vcurrent, overrides):
+    '''
+    Change the control parameters of a resumed analysis and set the test and algorithm again.
+    '''
+    control=vcontrol
+    current=vcurrent
+    control.update(overrides)
+    if 'logLevel' in overrides or 'logFile' in overrides or 'debugMode' in overrides:
+        CloseLog(control)
+        OpenLog(control)
+    current['checkpointTime']=time.time()
+    if control['logLevel']>=LOG_PROGRESS:
+        Log(control, ">>> SmartAnalyze: Resumed at progress %i with %s.", current['progress'], overrides)
+    
+    test(control['testType'], control['testTol'], control['testIterTimes'], control['testPrintFlag'])
+    current['testIterTimes']=control['testIterTimes']
+    current['testTol']=control['testTol']
+    if 'algoTypes' in overrides:
+        current['algoOrder']=list(range(len(control['algoTypes'])))
+        for error in ValidateAlgorithms(control['algoTypes']):
+            if control['logLevel']>=LOG_SUMMARY:
+                Log(control, error)
+    algoType=control['algoTypes'][current['algoOrder'][0]]
+    setAlgorithm(algoType, control, True)
+    current['algoType']=algoType
+    if 'initialStep' in overrides:
+        current['adaptStep']=abs(control['initialStep'])
+        current['cheapRuns']=0
+    current['block']=1
 
 
+def ResumeFromCheckpoint(vcontrol, vcurrent):
+    '''
+    After a failure, resume from the last checkpoint with the next entry of resumeControls.
+    Return the exit code of the snapshot process once it is done, see ResumeLastCheckpoint,
+    None if there is nothing to resume.
+    '''
+    control=vcontrol
+    current=vcurrent
+    attempt=current['resumeAttempt']
+    if _snapshot is None or attempt>=len(control['resumeControls']):
+        return None
+    if control['logLevel']>=LOG_SUMMARY:
+        Log(control, ">>> SmartAnalyze: Resuming from the checkpoint at progress %i, attempt %i.",
+            current['checkpointProgress'], attempt+1)
+    CloseLog(control)
+    code=_Resume(control['resumeControls'][attempt], attempt+1)
+    OpenLog(control)
+    if control['logLevel']>=LOG_SUMMARY:
+        Log(control, ">>> SmartAnalyze: The resumed process exited with code %i.", code)
+    CloseLog(control)
+    return code
 
 
+def ResumeLastCheckpoint(ud=None):
+    '''
+    Resume the last analysis from its last checkpoint with changed control parameters.
+    The script goes on in the snapshot process from the SmartAnalyze call that made the checkpoint.
+    This process waits for it and returns its exit code (negative for a signal), None if there is no checkpoint.
+    ud: control parameters to change
+    '''
+    if _snapshot is None:
+        return None
+    return _Resume(ud or {}, None)
 
 
+def ReleaseCheckpoint():
+    '''
+    Let the snapshot process of the last checkpoint exit.
+    '''
+    global _snapshot
+    if _snapshot is None:
+        return
+    os.close(_snapshot['pipe'])
+    os.waitpid(_snapshot['pid'], 0)
+    _snapshot=None
 
 
+def _Resume(overrides, attempt):
+    global _snapshot
+    snapshot=_snapshot
+    _snapshot=None
+    sys.stdout.flush()
+    sys.stderr.flush()
+    with os.fdopen(snapshot['pipe'], 'wb') as f:
+        pickle.dump((overrides, attempt), f)
+    status=os.waitpid(snapshot['pid'], 0)[1]
+    return os.waitstatus_to_exitcode(status)
 
 
+def _CheckpointError():
+    # why the process cannot fork snapshots, None if it can
+    if not hasattr(os, 'fork'):
+        return "checkpoints need os.fork, not available on this platform."
+    if 'ipykernel' in sys.modules or hasattr(sys, 'ps1') or sys.flags.interactive:
+        return "checkpoints are only available in a plain script, not in a notebook or interactive session."
+    if multiprocessing.parent_process() is not None:
+        return "checkpoints are not available in a multiprocessing worker."
+    if threading.current_thread() is not threading.main_thread():
+        return "checkpoints are only available in the main thread."
+    return None
 
 
+def setAlgorithm(algotype, vcontrol=None, force=False):
+    '''
+    algotype: the algorithm type flag, see the reference in README.md
+    vcontrol: the control dict of a running analysis, its log receives the messages
+    force: issue the algorithm command even if this type is already active
+    '''
+    global _activeAlgorithm
+    algotype=int(algotype)
+    if algotype==_activeAlgorithm and not force:
+        return
+    
+    args=ALGORITHMS.get(algotype)
+    if args is not None:
+        name=_algorithmNames[algotype]
+        func=None
+    else:
+        func=UserAlgorithm(algotype)
+        if func is None:
+            if vcontrol is None or vcontrol['logLevel']>=LOG_SUMMARY:
+                Log(vcontrol, "!!! SmartAnalyze: ERROR! WRONG Algorithm Type %s!", algotype)
+            return
+        name=getattr(func, '__name__', 'User-defined%i' %(algotype-90))
+    
+    if vcontrol is None or vcontrol['logLevel']>=LOG_DEBUG:
+        Log(vcontrol, "> SmartAnalyze: Setting algorithm to  %s ...", name)
+    if func is None:
+        algorithm(*args)
+    else:
+        func()
+    _activeAlgorithm=algotype
 
 
+def RegisterAlgorithm(algotype, func):
+    '''
+    Register a user-defined algorithm.
+    algotype: 90, 91 or 92
+    func: function without arguments that issues the OpenSees algorithm command, None to unregister
+    '''
+    if algotype not in USER_ALGORITHMS:
+        raise ValueError("SmartAnalyze: user-defined algorithm types are %s, not %s" %(sorted(USER_ALGORITHMS), algotype))
+    if func is None:
+        _userAlgorithms.pop(algotype, None)
+    else:
+        _userAlgorithms[algotype]=func
+    
+    # the next setAlgorithm must issue the command
+    global _activeAlgorithm
+    if _activeAlgorithm==algotype:
+        _activeAlgorithm=None
 
 
+def UserAlgorithm(algotype):
+    '''
+    The function of a user-defined algorithm type: the registered one, else UserAlgorithm0/1/2 of the main script.
+    Return None if there is none.
+    '''
+    func=_userAlgorithms.get(algotype)
+    if func is None and algotype in USER_ALGORITHMS:
+        func=getattr(sys.modules.get('__main__'), USER_ALGORITHMS[algotype], None)
+    if func is not None and not callable(func):
+        return None
+    return func
 
 
+def ValidateAlgorithms(algoTypes):
+    '''
+    Check the algorithm type flags before an analysis.
+    Return a list of error messages, empty if all flags can be set.
+    '''
+    errors=[]
+    for algotype in algoTypes:
+        try:
+            flag=int(algotype)
+        except (TypeError, ValueError):
+            errors.append("!!! SmartAnalyze: ERROR! WRONG Algorithm Type %s!" %(algotype,))
+            continue
+        if flag in ALGORITHMS:
+            continue
+        if flag in USER_ALGORITHMS:
+            if UserAlgorithm(flag) is None:
+                errors.append("!!! SmartAnalyze: ERROR! Algorithm Type %i needs RegisterAlgorithm(%i, func) or %s in the script!"
+                              %(flag, flag, USER_ALGORITHMS[flag]))
+            continue
+        errors.append("!!! SmartAnalyze: ERROR! WRONG Algorithm Type %s!" %(algotype,))
+    return errors
 
 
+def OpenLog(vcontrol):
+    '''
+    Resolve the logging control parameters into the sink used by Log.
+    vcontrol: control dict, logLevel becomes an integer level
+    '''
+    control=vcontrol
+    level=control['logLevel']
+    if control['debugMode']:
+        level='debug'
+    if isinstance(level, str):
+        level=LOG_LEVELS[level]
+    control['logLevel']=level
+    
+    sink=control['logFile']
+    control['_logClose']=None
+    if level==LOG_SILENT or sink is None:
+        control['_logWrite']=None
+    elif isinstance(sink, str):
+        f=open(sink, 'a')
+        control['_logWrite']=f.write
+        control['_logClose']=f.close
+    elif isinstance(sink, list):
+        control['_logWrite']=lambda msg: sink.append(msg.rstrip('\n'))
+    else:
+        control['_logWrite']=sink.write
+    control['_lastPrint']=time.time()
 
 
+def CloseLog(vcontrol):
+    '''
+    Close the log file opened by OpenLog.
+    '''
+    if vcontrol.get('_logClose') is not None:
+        vcontrol['_logClose']()
+        vcontrol['_logClose']=None
 
 
+def Log(vcontrol, msg, *args):
+    '''
+    Write one message. Callers check the level first, so nothing is formatted when it is not reported.
+    vcontrol: control dict prepared by OpenLog, None for the console
+    msg: message, formatted with args if any
+    '''
+    if args:
+        msg=msg %args
+    write=None if vcontrol is None else vcontrol['_logWrite']
+    if write is None:
+        print(msg)
+    else:
+        write(msg+'\n')
 
 
+def LogProgress(vcontrol, vcurrent):
+    '''
+    Report the progress at most once per printInterval seconds.
+    '''
+    now=time.time()
+    if now-vcontrol['_lastPrint']<vcontrol['printInterval']:
+        return
+    vcontrol['_lastPrint']=now
+    progress=vcurrent['progress']/vcurrent['segs']
+    elapsed=now-vcurrent['startTime']
+    remaining=elapsed*(1.0-progress)/progress if progress>0 else float('nan')
+    Log(vcontrol, "* SmartAnalyze: progress %f (%i/%i). Time consumption: %f s, remaining about %f s.",
+        progress, vcurrent['progress'], vcurrent['segs'], elapsed, remaining)
@@ -0,0 +1,2 @@
+# test_concreteCM_unsolved.py is a script, not a test module
+collect_ignore = ["test_concreteCM_unsolved.py"]
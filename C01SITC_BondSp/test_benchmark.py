@@ -0,0 +1,24 @@
+import json
+
+import pytest
+
+import Benchmark
+
+
+def test_all_workloads_by_default():
+    args = Benchmark.ParseArguments([])
+    assert args.workloads == list(Benchmark.WORKLOADS)
+
+
+def test_unknown_workload():
+    with pytest.raises(SystemExit):
+        Benchmark.ParseArguments(["sdof", "nonsense"])
+
+
+def test_save_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    code = Benchmark.Main(["sdof", "--repeat", "1", "--record-points", "200",
+                           "--save", str(baseline)])
+    assert code == 0
+    with open(baseline) as f:
+        assert "sdof" in json.load(f)["workloads"]
@@ -0,0 +1,47 @@
+import numpy as np
+
+from Calibration import HysteresisError
+
+
+def _History(step):
+    # Samples of the protocol 0 -> 1 -> -1 -> 1, with their branches
+    protocol = np.array([1.0, -1.0, 1.0])
+    starts = np.concatenate(([0.0], protocol[:-1]))
+    disp, branch = [], []
+    for k, (start, target) in enumerate(zip(starts, protocol)):
+        n = int(round(abs(target - start) / step))
+        disp.append(np.linspace(start, target, n + 1)[1:])
+        branch.append(np.full(n, k))
+    return protocol, starts, np.concatenate(disp), np.concatenate(branch)
+
+
+def _Test():
+    protocol, starts, disp, branch = _History(0.1)
+    return {"protocol": protocol, "starts": starts, "disp": disp,
+            "force": 2 * disp, "branch": branch}
+
+
+def _Simulated(scale):
+    protocol, starts, disp, branch = _History(0.25)
+    # The start point of every branch, as Calibration collects them
+    disp = np.concatenate((starts, disp))
+    branch = np.concatenate((np.arange(3), branch))
+    order = np.lexsort((np.arange(len(disp)), branch))
+    disp, branch = disp[order], branch[order]
+    return disp, scale * 2 * disp, branch
+
+
+def test_exact_hysteresis_has_no_error():
+    disp, force, branch = _Simulated(1.0)
+    assert HysteresisError(disp, force, branch, _Test()) < 1.0e-12
+
+
+def test_first_branches_bound_the_full_error():
+    test = _Test()
+    disp, force, branch = _Simulated(1.2)
+    full = HysteresisError(disp, force, branch, test)
+    partial = [HysteresisError(disp, force, branch, test, n)
+               for n in (1, 2, 3)]
+    assert partial[0] <= partial[1] <= partial[2]
+    assert partial[2] == full
+    assert full > 0.05
@@ -0,0 +1,58 @@
+import numpy as np
+
+import ColumnModel
+import SmartAnalyze
+
+
+def _Run(block_steps, monkeypatch=None):
+    calls = []
+    if monkeypatch is not None:
+        analyze = SmartAnalyze.analyze
+
+        def Analyze(*args):
+            calls.append(args)
+            return analyze(*args)
+        monkeypatch.setattr(SmartAnalyze, "analyze", Analyze)
+    protocol = ColumnModel.DefaultProtocol("c01")[:4]
+    node, dof = ColumnModel.C01Column()
+    ok, results = ColumnModel.Pushover(node, dof, protocol, control={
+        "blockSteps": block_steps}, history=False)
+    return ok, results, calls
+
+
+def test_column_run_issues_blocks(monkeypatch):
+    ok, results, calls = _Run(64, monkeypatch)
+    assert ok == 0
+    assert max(args[0] for args in calls) > 1
+
+
+def test_blocks_keep_the_response():
+    ok, single, calls = _Run(1)
+    ok_blocks, blocks, calls = _Run(64)
+    assert ok == ok_blocks == 0
+    assert blocks["disp"][0] == single["disp"][0]
+    assert abs(blocks["force"][0] - single["force"][0]) <= 1.0e-9 * abs(
+        single["force"][0])
+
+
+def _Branches(step):
+    # Samples of the protocol 0 -> 1 -> -1 at pieces of the given step
+    up = np.arange(step, 1.0 + 1e-9, step)
+    down = np.arange(1.0 - step, -1.0 - 1e-9, -step)
+    return np.concatenate((up, down))
+
+
+def test_force_error_ignores_the_piece_lengths():
+    reference = _Branches(0.1)
+    disp = _Branches(0.25)
+    assert len(disp) != len(reference)
+    assert ColumnModel.ForceError(disp, 2 * disp, reference,
+                                  2 * reference) < 1.0e-12
+    error = ColumnModel.ForceError(disp, 2.2 * disp, reference, 2 * reference)
+    assert abs(error - 0.1 * np.sqrt(np.mean(reference ** 2))) < 1.0e-12
+
+
+def test_force_error_of_a_short_run():
+    reference = _Branches(0.1)
+    disp = _Branches(0.25)[:-2]
+    assert ColumnModel.ForceError(disp, disp, reference, reference) == np.inf
@@ -0,0 +1,24 @@
+import numpy as np
+
+from FidelitySweep import FidelityGrid, ParetoFront
+
+
+def test_grid_order():
+    cases = FidelityGrid("dispBeamColumn", (1, 2), "Legendre", (3, 5))
+    assert [(c["n_elements"], c["n_points"]) for c in cases] == [
+        (1, 3), (1, 5), (2, 3), (2, 5)]
+
+
+def test_pareto_front():
+    rows = [{"name": "slow exact", "seconds": 4.0, "error": 0.0},
+            {"name": "fast rough", "seconds": 1.0, "error": 0.05},
+            {"name": "dominated", "seconds": 2.0, "error": 0.06},
+            {"name": "middle", "seconds": 3.0, "error": 0.01},
+            {"name": "failed", "seconds": 0.5, "error": np.inf},
+            {"name": "tie slower", "seconds": 3.0, "error": 0.02}]
+    front = ParetoFront(rows)
+    assert [row["name"] for row in front] == [
+        "failed", "fast rough", "dominated", "middle", "tie slower",
+        "slow exact"]
+    assert [row["name"] for row in front if row["pareto"]] == [
+        "fast rough", "middle", "slow exact"]
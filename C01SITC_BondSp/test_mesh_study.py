@@ -0,0 +1,18 @@
+import ColumnModel
+import MeshStudy
+
+
+def test_every_mesh_is_run_by_default():
+    protocol = ColumnModel.DefaultProtocol("c01")[:4]
+    study = MeshStudy.MeshConvergence("c01", [1.0, None, 4.5], protocol,
+                                      tolerance=0.0)
+    assert [row["fiber_size"] for row in study.rows] == [1.0, None, 4.5]
+    assert study.rows[0]["error"] == 0.0
+    assert study.best is study.rows[0]
+
+
+def test_stop_early():
+    protocol = ColumnModel.DefaultProtocol("c01")[:4]
+    study = MeshStudy.MeshConvergence("c01", [1.0, None, 4.5], protocol,
+                                      tolerance=0.0, stop_early=True)
+    assert len(study.rows) == 2
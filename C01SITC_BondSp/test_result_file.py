@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pytest
+
+from ResultFile import ConvertText, LoadResults, WriteResults
+
+
+def test_round_trip(tmp_path):
+    filename = str(tmp_path / "probes.bin")
+    disp = np.linspace(-1.0, 1.0, 7)
+    stress = np.arange(21.0).reshape(7, 3)
+    WriteResults(filename, {"disp": disp, "stress": stress},
+                 units={"disp": "in"}, ids={"disp": 3, "stress": [1, 2, 4]},
+                 attrs={"model": "c01"})
+    results = LoadResults(filename)
+    assert results.n_rows == 7
+    np.testing.assert_array_equal(results.columns["disp"], disp)
+    np.testing.assert_array_equal(results.columns["stress"], stress)
+    np.testing.assert_array_equal(results.columns["stress"][2:4, 1],
+                                  stress[2:4, 1])
+    assert results.units == {"disp": "in", "stress": None}
+    assert results.ids == {"disp": 3, "stress": [1, 2, 4]}
+    assert results.attrs == {"model": "c01"}
+
+
+def test_stored_dtype(tmp_path):
+    filename = str(tmp_path / "probes.bin")
+    WriteResults(filename, {"x": np.arange(5.0)}, dtype=np.float32)
+    assert LoadResults(filename).columns["x"].dtype == np.float32
+
+
+def test_empty_file(tmp_path):
+    filename = str(tmp_path / "empty.bin")
+    WriteResults(filename, {})
+    results = LoadResults(filename)
+    assert results.n_rows == 0
+    assert results.columns == {}
+    WriteResults(filename, {"x": np.empty(0), "y": np.empty((0, 2))})
+    results = LoadResults(filename)
+    assert results.columns["x"].shape == (0,)
+    assert results.columns["y"].shape == (0, 2)
+
+
+def test_rows_must_match(tmp_path):
+    with pytest.raises(ValueError):
+        WriteResults(str(tmp_path / "bad.bin"),
+                     {"x": np.zeros(3), "y": np.zeros(4)})
+
+
+def test_convert_text_again_when_arguments_change(tmp_path):
+    text_file = str(tmp_path / "out.txt")
+    np.savetxt(text_file, [[0.0, 1.5], [1.0, 2.5], [2.0, 3.5]])
+    result_file = ConvertText(text_file, names=["disp", "force"])
+    columns = LoadResults(result_file).columns
+    np.testing.assert_array_equal(columns["force"], [1.5, 2.5, 3.5])
+    mtime = os.stat(result_file).st_mtime_ns
+
+    # Same arguments, not converted again
+    ConvertText(text_file, names=["disp", "force"])
+    assert os.stat(result_file).st_mtime_ns == mtime
+
+    ConvertText(text_file, names=["u", "p"])
+    assert set(LoadResults(result_file).columns) == {"u", "p"}
+    ConvertText(text_file, names=["u", "p"], dtype=np.float32)
+    assert LoadResults(result_file).columns["u"].dtype == np.float32
+    ConvertText(text_file)
+    assert set(LoadResults(result_file).columns) == {"col0", "col1"}
@@ -0,0 +1,239 @@
+import json
+import os
+import subprocess
+import sys
+
+import openseespy.opensees as ops
+import pytest
+
+import SmartAnalyze
+
+
+def _Stats(trials, successes, seconds):
+    # decayed and plain sums of RecordAlgorithm
+    return [[float(trials), float(successes), 0.0, seconds],
+            [trials, successes, 0, seconds]]
+
+
+def test_algorithm_order_without_alternation():
+    # 40 often fails, 10 was never tried: only worth trying with alternation
+    current = {'algoStats': {40: _Stats(10, 2, 1.0)}}
+    control = {'algoTypes': [40, 10], 'tryAlterAlgoTypes': True}
+    SmartAnalyze.OrderAlgorithms(control, current)
+    assert current['algoOrder'] == [1, 0]
+    control['tryAlterAlgoTypes'] = False
+    SmartAnalyze.OrderAlgorithms(control, current)
+    assert current['algoOrder'] == [0, 1]
+
+
+def _Springs():
+    # a smooth Steel02 spring in series with an elastic one, pushed at node 3
+    ops.wipe()
+    ops.model('basic', '-ndm', 1, '-ndf', 1)
+    for tag in (1, 2, 3):
+        ops.node(tag, 0.0)
+    ops.fix(1, 1)
+    ops.uniaxialMaterial('Steel02', 1, 1.0, 1.0, 0.05, 3.0, 0.925, 0.15)
+    ops.uniaxialMaterial('Elastic', 2, 1.0)
+    ops.element('zeroLength', 1, 1, 2, '-mat', 1, '-dir', 1)
+    ops.element('zeroLength', 2, 2, 3, '-mat', 2, '-dir', 1)
+    ops.timeSeries('Linear', 1)
+    ops.pattern('Plain', 1, 1)
+    ops.load(3, 1.0)
+    ops.constraints('Plain')
+    ops.numberer('Plain')
+    ops.system('BandGen')
+    return 3, 1
+
+
+def _Recursive(step, algoIndex, testIterTimes, testTol, control, current):
+    # RecursiveAnalyze of SmartAnalyze v0.0, without its prints
+    if algoIndex != current['algoIndex']:
+        ops.algorithm(*SmartAnalyze.ALGORITHMS[control['algoTypes'][algoIndex]])
+        current['algoIndex'] = algoIndex
+    if testIterTimes != current['testIterTimes'] or testTol != current['testTol']:
+        current['testIterTimes'] = testIterTimes
+        current['testTol'] = testTol
+        ops.test(control['testType'], testTol, testIterTimes, 0)
+    if current['step'] != step:
+        ops.integrator('DisplacementControl', current['node'], current['dof'], step)
+        current['step'] = step
+    ok = ops.analyze(1)
+    current['calls'] += 1
+    if ok == 0:
+        return 0
+    if control['tryAddTestTimes'] and testIterTimes != control['testIterTimesMore']:
+        if ops.testNorm()[-1] < control['normTol']:
+            return _Recursive(step, algoIndex, control['testIterTimesMore'], testTol, control, current)
+    if control['tryAlterAlgoTypes'] and algoIndex + 1 < len(control['algoTypes']):
+        return _Recursive(step, algoIndex + 1, testIterTimes, testTol, control, current)
+    if abs(step) < 2 * control['minStep']:
+        return -1
+    stepNew = step * control['relaxation']
+    if 0 < stepNew < control['minStep']:
+        stepNew = control['minStep']
+    if -control['minStep'] < stepNew < 0:
+        stepNew = -control['minStep']
+    if _Recursive(stepNew, 0, testIterTimes, testTol, control, current) < 0:
+        return -1
+    if _Recursive(step - stepNew, 0, testIterTimes, testTol, control, current) < 0:
+        return -1
+    return 1
+
+
+# a control that makes the springs divide steps, add test times and alternate algorithms
+SPLITTING = {'testType': 'NormDispIncr', 'testTol': 1.0e-10, 'testIterTimes': 3, 'tryAddTestTimes': True,
+             'normTol': 1.0e-3, 'testIterTimesMore': 5, 'tryAlterAlgoTypes': True, 'algoTypes': [10, 40],
+             'relaxation': 0.5, 'minStep': 1.0e-4}
+
+
+def test_iterative_analyze_matches_the_recursion(monkeypatch):
+    targets = [1.5, -1.0, 2.0]
+    maxStep = 0.25
+    control = dict(SPLITTING)
+
+    node, dof = _Springs()
+    ops.test(control['testType'], control['testTol'], control['testIterTimes'], 0)
+    ops.algorithm(*SmartAnalyze.ALGORITHMS[control['algoTypes'][0]])
+    ops.integrator('DisplacementControl', node, dof, maxStep)
+    ops.analysis('Static')
+    current = {'algoIndex': 0, 'testIterTimes': control['testIterTimes'], 'testTol': control['testTol'],
+               'step': maxStep, 'node': node, 'dof': dof, 'calls': 0}
+    position = 0.0
+    for target in targets:
+        sign = 1.0 if target > position else -1.0
+        for i in range(int(round(abs(target - position) / maxStep))):
+            assert _Recursive(sign * maxStep, 0, control['testIterTimes'], control['testTol'], control, current) >= 0
+        position = target
+    expected = (ops.nodeDisp(2, 1), ops.getTime(), current['calls'])
+    assert current['calls'] > 26
+
+    calls = []
+    analyze = SmartAnalyze.analyze
+
+    def Analyze(*args):
+        calls.append(args)
+        return analyze(*args)
+    monkeypatch.setattr(SmartAnalyze, 'analyze', Analyze)
+    node, dof = _Springs()
+    ok = SmartAnalyze.SmartAnalyzeStatic(node, dof, maxStep, targets, dict(control, logLevel='silent'))
+    assert ok == 0
+    assert (ops.nodeDisp(2, 1), ops.getTime(), len(calls)) == expected
+
+
+def test_static_segments_merge_short_remainders():
+    steps, index = SmartAnalyze.StaticSegments([1.0, 0.4], 0.3)
+    assert steps.tolist() == pytest.approx([0.3, 0.3, 0.3, 0.1, -0.3, -0.3])
+    assert index.tolist() == [0, 0, 0, 0, 1, 1]
+    # a remainder below tol goes into the last full step
+    steps, index = SmartAnalyze.StaticSegments([0.9 + 1.0e-7], 0.3)
+    assert steps.tolist() == pytest.approx([0.3, 0.3, 0.3 + 1.0e-7], abs=1.0e-12)
+    assert steps.sum() == pytest.approx(0.9 + 1.0e-7, abs=1.0e-12)
+    steps, index = SmartAnalyze.StaticSegments([1.0e-7], 0.3)
+    assert len(steps) == 0 and len(index) == 0
+
+
+def test_reversal_points_skip_small_reversals():
+    history = [0.0, 0.5, 1.0, 0.99, 2.0, 1.0, 1.005, 0.0, 0.0]
+    targets, indices = SmartAnalyze.ReversalPoints(history, tol=0.05)
+    assert targets.tolist() == [2.0, 0.0]
+    assert indices.tolist() == [4, 8]
+    # without a tolerance every reversal is kept
+    targets, indices = SmartAnalyze.ReversalPoints(history)
+    assert targets.tolist() == [1.0, 0.99, 2.0, 1.0, 1.005, 0.0]
+
+
+def test_registry_accepts_secant_and_user_algorithms():
+    assert SmartAnalyze.ALGORITHMS[22] == ('NewtonLineSearch', '-type', 'Secant')
+    issued = []
+    for algotype in (90, 91, 92):
+        SmartAnalyze.RegisterAlgorithm(algotype, lambda algotype=algotype: issued.append(algotype) or ops.algorithm('Newton'))
+    try:
+        assert SmartAnalyze.ValidateAlgorithms([22, 90, 91, 92]) == []
+        node, dof = _Springs()
+        control = dict(SPLITTING, algoTypes=[22, 90, 91, 92], logLevel='silent')
+        assert SmartAnalyze.SmartAnalyzeStatic(node, dof, 0.25, [1.5], control) == 0
+        for algotype in (90, 91, 92):
+            SmartAnalyze.setAlgorithm(algotype)
+        assert issued[-3:] == [90, 91, 92]
+    finally:
+        for algotype in (90, 91, 92):
+            SmartAnalyze.RegisterAlgorithm(algotype, None)
+    assert len(SmartAnalyze.ValidateAlgorithms([90])) == 1
+    with pytest.raises(ValueError):
+        SmartAnalyze.RegisterAlgorithm(93, lambda: None)
+
+
+def test_probes_sample_each_converged_piece(monkeypatch):
+    converged = []
+    analyze = SmartAnalyze.analyze
+
+    def Analyze(*args):
+        ok = analyze(*args)
+        if ok == 0:
+            converged.append(ops.nodeDisp(2, 1))
+        return ok
+    monkeypatch.setattr(SmartAnalyze, 'analyze', Analyze)
+    node, dof = _Springs()
+    control = dict(SPLITTING, logLevel='silent', probes={'disp': ('nodeDisp', 2, 1), 'force': ('basicForce', 1)})
+    ok, results = SmartAnalyze.SmartAnalyzeStatic(node, dof, 0.25, [1.5, -1.0, 2.0], control)
+    assert ok == 0
+    assert len(converged) > 26
+    assert results['disp'].tolist() == converged
+    assert results['force'].shape == (len(converged), 1)
+
+
+# two springs pushed to [4, -4]; with testIterTimes 1 the step where the steel yields fails
+RESUMING_SCRIPT = '''
+import json, sys
+import openseespy.opensees as ops
+import SmartAnalyze
+
+ops.model('basic', '-ndm', 1, '-ndf', 1)
+for tag in (1, 2, 3):
+    ops.node(tag, 0.0)
+ops.fix(1, 1)
+ops.uniaxialMaterial('Steel01', 1, 1.0, 1.0, 0.1)
+ops.uniaxialMaterial('Elastic', 2, 1.0)
+ops.element('zeroLength', 1, 1, 2, '-mat', 1, '-dir', 1)
+ops.element('zeroLength', 2, 2, 3, '-mat', 2, '-dir', 1)
+ops.timeSeries('Linear', 1)
+ops.pattern('Plain', 1, 1)
+ops.load(3, 1.0)
+ops.constraints('Plain')
+ops.numberer('Plain')
+ops.system('BandGen')
+control = {'testType': 'NormDispIncr', 'testIterTimes': int(sys.argv[1]), 'minStep': 0.05, 'algoTypes': [10],
+           'tryAddTestTimes': False, 'tryLooseTestTol': False, 'logLevel': 'silent',
+           'probes': {'disp': ('nodeDisp', 3, 1), 'time': ('getTime',)}}
+if sys.argv[2] == 'checkpoints':
+    control.update(checkpointEvery=3, resumeControls=[{'testIterTimes': 50}])
+ok, results = SmartAnalyze.SmartAnalyzeStatic(3, 1, 0.1, [4.0, -4.0], control)
+print(json.dumps({'ok': ok, 'disp': results['disp'].tolist(), 'time': results['time'].tolist()}), flush=True)
+'''
+
+
+def _RunResuming(tmp_path, *args):
+    # checkpoints fork the process, so they run in a script of their own, never in pytest
+    script = tmp_path / 'resuming.py'
+    script.write_text(RESUMING_SCRIPT)
+    folder = os.path.dirname(os.path.abspath(SmartAnalyze.__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([folder, os.environ.get('PYTHONPATH', '')]))
+    done = subprocess.run([sys.executable, str(script)] + list(args), cwd=tmp_path, env=env,
+                          stdout=subprocess.PIPE, check=True, timeout=120)
+    return [json.loads(line) for line in done.stdout.decode().splitlines() if line.startswith('{')]
+
+
+def test_checkpoint_resume(tmp_path):
+    [reference] = _RunResuming(tmp_path, '50', 'none')
+    assert reference['ok'] == 0
+    [failed] = _RunResuming(tmp_path, '1', 'none')
+    assert failed['ok'] < 0
+
+    # the resumed child finishes the script, then the parent reports RESUMED
+    resumed, parent = _RunResuming(tmp_path, '1', 'checkpoints')
+    assert parent['ok'] == SmartAnalyze.RESUMED
+    assert resumed['ok'] == 0
+    assert resumed['disp'] == pytest.approx(reference['disp'])
+    assert resumed['time'] == pytest.approx(reference['time'])
+    assert resumed['disp'][-1] == pytest.approx(-4.0)